@@ -0,0 +1,152 @@
+"""
+Checks that the NumPy separate_colorway of dash_bootstrap_templates._colors gives the same colorways as the
+spectra and colormath version it replaced, which is kept here as the reference:
+
+    $ python _check_colors.py
+
+It needs the packages of the `dev` extra.
+"""
+
+import random
+
+import numpy as np
+import spectra
+from colormath.color_diff import delta_e_cie1994
+from colormath.color_objects import LabColor
+
+from dash_bootstrap_templates._colors import separate_colorway as numpy_separate_colorway, to_rgb_tuple
+
+if not hasattr(np, "asscalar"):
+    # workaround for using deprecated asscalar in colormath
+    # https://github.com/gtaylor/python-colormath/issues/104
+    setattr(np, "asscalar", lambda a: a.item())
+
+white = spectra.lab(100, 0, 0)
+black = spectra.lab(0, 0, 0)
+
+
+def to_colormath(spectra_color):
+    lab_values = spectra.html(spectra_color.hexcode).to("lab").values
+    return LabColor(*lab_values)
+
+
+def color_distance(clr1, clr2):
+    return delta_e_cie1994(to_colormath(clr1), to_colormath(clr2))
+
+
+def get_darkened_colors(colors, darkening_list):
+    return [c.darken(d) for c, d in zip(colors, darkening_list)]
+
+
+def best_darkening(c1, c2, c1_step=(1, 1), c2_step=(1, 1)):
+    d = color_distance(c1, c2)
+    d1 = color_distance(c1.darken(c1_step[1]), c2)
+    dm1 = color_distance(c1.darken(c1_step[0]), c2)
+    d2 = color_distance(c1, c2.darken(c2_step[1]))
+    dm2 = color_distance(c1, c2.darken(c2_step[0]))
+
+    # Return step with sign that increases distance most
+    # Return 0 if either step lower distance
+    return sorted(
+        [
+            (d, (0, 0)),
+            (d1, (c1_step[1], 0)),
+            (dm1, (c1_step[0], 0)),
+            (d2, (0, c2_step[1])),
+            (dm2, (0, c2_step[0])),
+        ]
+    )[-1]
+
+
+def separate_colorway(html_colors):
+    try:
+        raw_colors = [spectra.rgb(*[c / 255 for c in to_rgb_tuple(clr)]) for clr in html_colors]
+    except ValueError:
+        # Unable to parse colors as hex or rgb, return as-is
+        return html_colors
+
+    test_colors = [white] + raw_colors + [black]
+
+    darkenings = list(np.zeros(len(test_colors)))
+    threshold = 36
+
+    max_shift = 16
+    max_step = 16
+    max_iterations = 4
+    max_step_factor = 0.9
+
+    iterations = 0
+
+    while iterations < max_iterations:
+        for i in range(len(test_colors) - 1):
+            c1 = test_colors[i].darken(darkenings[i])
+            for j in range(i + 1, len(test_colors)):
+                c2 = test_colors[j].darken(darkenings[j])
+                distance = color_distance(c1, c2)
+
+                # When comparing to black and white,
+                # skip if at least threshold units away
+                if distance > threshold:
+                    continue
+
+                # Compute max step based on how close colors are
+                this_step = max_step * ((100 - distance) / 100) ** 2
+
+                # Clamp max steps based on how close we are to max shift allowances
+                c1_step_up = max(0, min(this_step, max_shift - darkenings[i]))
+                c2_step_up = max(0, min(this_step, max_shift - darkenings[j]))
+                c1_step_down = min(0, max(-this_step, -darkenings[i] - max_shift))
+                c2_step_down = min(0, max(-this_step, -darkenings[j] - max_shift))
+
+                # Compute best way to lighten or darken ONE of the colors (not both)
+                distance, (delta1, delta2) = best_darkening(
+                    c1,
+                    c2,
+                    c1_step=(c1_step_down, c1_step_up),
+                    c2_step=(c2_step_down, c2_step_up),
+                )
+
+                darkenings[i] += delta1
+                darkenings[j] += delta2
+
+        iterations += 1
+        max_step *= max_step_factor
+
+    return [clr.hexcode for clr in get_darkened_colors(test_colors, darkenings)[1:-1]]
+
+
+# The role colors of the Bootstrap themes (primary, danger, success, warning, info), for check()
+_CHECK_COLORWAYS = [
+    ["#0d6efd", "#dc3545", "#198754", "#ffc107", "#0dcaf0"],
+    ["#375a7f", "#e74c3c", "#00bc8c", "#f39c12", "#3498db"],
+    ["#78c2ad", "#ff7851", "#56cc9d", "#ffce67", "#6cc3d5"],
+    ["#2a9fd6", "#c00", "#77b300", "#f80", "#93c"],
+    ["rgb(13, 110, 253)", "#dc3545", "#198754", "#ffc107", "#0dcaf0"],
+    ["#000", "#fff", "#111", "#eee", "#808080"],
+]
+
+
+def check(number=50, seed=0):
+    """
+    Checks that the NumPy separate_colorway gives the same colorways as separate_colorway, for the colorways
+    of some Bootstrap themes and for `number` random colorways, half of them with colors that are close to each other.
+    """
+    rng = random.Random(seed)
+    colorways = list(_CHECK_COLORWAYS)
+    for n in range(number):
+        if n % 2:
+            base = [rng.randrange(256) for _ in range(3)]
+            colors = [tuple(min(255, max(0, c + rng.randint(-12, 12))) for c in base) for _ in range(5)]
+        else:
+            colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(5)]
+        colorways.append(["#%02x%02x%02x" % color for color in colors])
+
+    for colorway in colorways:
+        expected = separate_colorway(colorway)
+        if numpy_separate_colorway(colorway) != expected:
+            raise ValueError(f"separate_colorway({colorway}) is {numpy_separate_colorway(colorway)}, not {expected}")
+    print(f"{len(colorways)} colorways checked")
+
+
+if __name__ == "__main__":
+    check()
@@ -2,11 +2,10 @@
 """
 Example of light and dark color modes available in Bootstrap >= 5.3
 """
-from dash import Dash, html, dcc, Input, Output, Patch, clientside_callback, callback
+from dash import Dash, html, dcc, Input, Output, clientside_callback, callback
 import plotly.express as px
-import plotly.io as pio
 import dash_bootstrap_components as dbc
-from dash_bootstrap_templates import load_figure_template
+from dash_bootstrap_templates import load_figure_template, template_patch
 
 # adds  templates to plotly.io
 load_figure_template(["minty", "minty_dark"])
@@ -49,13 +48,8 @@ app.layout = dbc.Container(
     Input("switch", "value"),
 )
 def update_figure_template(switch_on):
-    # When using Patch() to update the figure template, you must use the figure template dict
-    # from plotly.io  and not just the template name
-    template = pio.templates["minty"] if switch_on else pio.templates["minty_dark"]
-
-    patched_figure = Patch()
-    patched_figure["layout"]["template"] = template
-    return patched_figure
+    # template_patch() returns a Patch with only the parts of the figure template that are different
+    return template_patch("minty_dark", "minty") if switch_on else template_patch("minty", "minty_dark")
 
 
 
@@ -1,2 +1,28 @@
 from .aio_theme_switch import ThemeSwitchAIO
 from .aio_theme_changer import ThemeChangerAIO, template_from_url
+from ._graph_templates import update_graph_templates
+
+# The clientside callbacks and styles of the components, served by Dash with the other component resources.
+# They are added once to the page however many components there are, and the url has the version and
+# modified time of the file, so the browser can cache it.
+_js_dist = [
+    {
+        "relative_package_path": "aio_theme_components.js",
+        "namespace": "aio",
+    }
+]
+_css_dist = [
+    {
+        "relative_package_path": "aio_theme_components.css",
+        "namespace": "aio",
+    }
+]
+
+
+def __getattr__(name):
+    # used by Dash in the url of the resources
+    if name == "__version__":
+        from dash_bootstrap_templates import _package_version
+
+        return _package_version() or "0.0.0"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
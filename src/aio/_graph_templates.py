@@ -0,0 +1,61 @@
+from functools import lru_cache
+
+from dash import Input, Output, Patch, State, callback, ctx, get_app
+import plotly.io as pio
+
+from dash_bootstrap_templates import template_patch, template_reference
+from .aio_theme_changer import ThemeChangerAIO, template_from_url
+from .aio_theme_switch import ThemeSwitchAIO
+
+
+@lru_cache(maxsize=None)
+def _template_assign_patch(template_name, by_reference):
+    """A Patch that replaces the figure template"""
+    patch = Patch()
+    patch["layout"]["template"] = template_reference(template_name) if by_reference else pio.templates[template_name]
+    return patch
+
+
+def update_graph_templates(aio_id, graph_id, component=ThemeChangerAIO):
+    """Registers one callback that updates the figure template of all the graphs matching `graph_id`
+    when the theme of the ThemeChangerAIO or ThemeSwitchAIO `aio_id` changes
+
+    - param: `aio_id` The `aio_id` of the theme component.
+    - param: `graph_id` A pattern-matching id of the dcc.Graph components, such as `{"type": "graph", "index": ALL}`.
+    - param: `component` ThemeChangerAIO (default) or ThemeSwitchAIO.
+
+    The callback is only called when the theme changes, so the figures must first be made with the template of
+    the selected theme.  The same cached Patch is returned for every graph, so the time spent in the callback doesn't grow with the
+    number of graphs.  When ThemeSwitchAIO is toggled, the patch only has the parts of the template that are
+    different (see template_patch).  When the app uses template references (see use_template_references),
+    both components send a reference to the template instead of the template.
+    """
+    if component is ThemeSwitchAIO:
+
+        @callback(
+            Output(graph_id, "figure", allow_duplicate=True),
+            Input(ThemeSwitchAIO.ids.switch(aio_id), "value"),
+            State(ThemeSwitchAIO.ids.store(aio_id), "data"),
+            prevent_initial_call=True,
+        )
+        def update_switch_graph_templates(switch_on, themes):
+            template_names = [template_from_url(theme) for theme in themes]
+            selected, other = template_names if switch_on else template_names[::-1]
+            if getattr(get_app(), "_dbt_template_references", False):
+                # the figures have a reference to the template, which is replaced instead of patched
+                return [_template_assign_patch(selected, True)] * len(ctx.outputs_list)
+            return [template_patch(other, selected)] * len(ctx.outputs_list)
+
+    elif component is ThemeChangerAIO:
+
+        @callback(
+            Output(graph_id, "figure", allow_duplicate=True),
+            Input(ThemeChangerAIO.ids.radio(aio_id), "value"),
+            prevent_initial_call=True,
+        )
+        def update_changer_graph_templates(theme):
+            by_reference = getattr(get_app(), "_dbt_template_references", False)
+            return [_template_assign_patch(template_from_url(theme), by_reference)] * len(ctx.outputs_list)
+
+    else:
+        raise ValueError("component must be ThemeChangerAIO or ThemeSwitchAIO")
@@ -0,0 +1,154 @@
+import html
+import json
+import re
+
+# prefix of the localStorage keys of the themes saved by the components with persistence
+THEME_STORAGE_PREFIX = "dash-bootstrap-templates"
+
+# Runs in the <head> of the index page, before the stylesheets.  The <link> of a theme of a component with
+# persistence is replaced by a script that calls dashBootstrapTemplatesThemeLink, which adds the link of the
+# saved theme instead, so the browser never downloads the default theme when another one was saved.
+THEME_LINK_SCRIPT = """
+(function (prefix) {
+    const saved = {}
+    try {
+        for (let i = 0; i < localStorage.length; i++) {
+            const key = localStorage.key(i)
+            const entry = key.startsWith(prefix) ? JSON.parse(localStorage.getItem(key)) : null
+            if (entry && entry.theme && Array.isArray(entry.themes)) {
+                entry.themes.forEach(theme => saved[theme] = entry.theme)
+            }
+        }
+    } catch (error) {
+    }
+    const added = new Set()
+    window.dashBootstrapTemplatesThemeLink = (script, href, tag) => {
+        const theme = saved[href] || href
+        if (added.has(theme)) {
+            return
+        }
+        added.add(theme)
+        if (theme === href) {
+            script.insertAdjacentHTML('afterend', tag)
+        } else {
+            const stylesheet = document.createElement("link")
+            stylesheet.rel = "stylesheet"
+            stylesheet.href = theme
+            script.after(stylesheet)
+        }
+    }
+})(%s)
+"""
+
+# The stylesheet links of the index page, and their href
+_LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_HREF = re.compile(r"""\shref=(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+
+# Runs in the <head> of the index page, after the stylesheets and before Dash renders the app.
+# For each theme saved by a component of this app, it removes the stylesheets of the component's other
+# themes and adds the saved one, so that the page is first painted with the saved theme.  It handles the
+# theme stylesheets that were not held back by THEME_LINK_SCRIPT.
+THEME_BOOT_SCRIPT = """
+(function (prefix) {
+    let saved = []
+    try {
+        for (let i = 0; i < localStorage.length; i++) {
+            const key = localStorage.key(i)
+            if (key.startsWith(prefix)) {
+                saved.push(JSON.parse(localStorage.getItem(key)))
+            }
+        }
+    } catch (error) {
+        return
+    }
+    for (const entry of saved) {
+        if (!entry || !entry.theme || !Array.isArray(entry.themes)) {
+            continue
+        }
+        const {theme, themes} = entry
+        document.querySelectorAll("link[rel='stylesheet']").forEach(link => {
+            const href = link.getAttribute('href')
+            if (href !== theme && themes.includes(href)) {
+                link.remove()
+            }
+        })
+        if (!document.querySelector(`link[rel='stylesheet'][href='${theme}']`)) {
+            let stylesheet = document.createElement("link")
+            stylesheet.rel = "stylesheet"
+            stylesheet.href = theme
+            document.head.appendChild(stylesheet)
+        }
+    }
+})(%s)
+"""
+
+
+def theme_storage_key(app, aio_id):
+    """The localStorage key of the theme saved by the component with this aio_id"""
+    return f"{THEME_STORAGE_PREFIX}:{app.config.requests_pathname_prefix}:{aio_id}"
+
+
+def _script_json(value):
+    """The value as json that can be in a <script> element"""
+    return json.dumps(value).replace("</", "<\\/")
+
+
+def _hold_back_theme_links(css, themes):
+    """Replace the <link> of the themes in the css of the index page by a script that adds the saved theme instead"""
+
+    def replace(match):
+        href = _HREF.search(match.group())
+        href = html.unescape(href.group(1) or href.group(2) or "") if href else None
+        if href not in themes:
+            return match.group()
+        return (
+            f"<script>window.dashBootstrapTemplatesThemeLink("
+            f"document.currentScript, {_script_json(href)}, {_script_json(match.group())})</script>"
+        )
+
+    return _LINK_TAG.sub(replace, css)
+
+
+def add_theme_boot_script(app, themes=()):
+    """
+    Add the scripts that apply the saved themes to the index page of the app. They are only added once per app.
+    `themes` are the theme urls of the component, whose links are only added once the saved theme is known.
+    """
+    app._theme_boot_themes = getattr(app, "_theme_boot_themes", set()) | set(themes)
+    if getattr(app, "_theme_boot_script", False):
+        return
+    app._theme_boot_script = True
+
+    prefix = f"{THEME_STORAGE_PREFIX}:{app.config.requests_pathname_prefix}:"
+    link_script = f"<script>{THEME_LINK_SCRIPT % _script_json(prefix)}</script>"
+    script = f"<script>{THEME_BOOT_SCRIPT % json.dumps(prefix)}</script>"
+    interpolate_index = app.interpolate_index
+
+    def interpolate_index_with_boot_script(**kwargs):
+        css = _hold_back_theme_links(kwargs["css"], app._theme_boot_themes)
+        kwargs["css"] = f"{link_script}\n{css}\n{script}"
+        return interpolate_index(**kwargs)
+
+    app.interpolate_index = interpolate_index_with_boot_script
+
+
+def graph_templates(app, template_names):
+    """
+    The figure templates used to update the graphs in the browser when the theme changes.
+    `template_names` is a dict of {theme url: template name}.  The templates are served by the app
+    (see serve_templates) and the browser fetches them when they are first used, so only their urls are
+    returned.  If the route can't be added anymore because the server already handled a request, the
+    templates themselves are returned.
+    """
+    from dash_bootstrap_templates import _read_template_dict, serve_templates, template_url
+
+    names = set(template_names.values())
+    try:
+        serve_templates(app)
+    except AssertionError as e:
+        # Flask doesn't allow adding a route after the first request, eg in a layout function
+        if "first request" not in str(e):
+            raise
+    if getattr(app, "_dbt_serve_templates", False):
+        return {"templateNames": template_names, "templateUrls": {name: template_url(name, app) for name in names}}
+    return {"templateNames": template_names, "templates": {name: _read_template_dict(name) for name in names}}
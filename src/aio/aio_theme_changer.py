@@ -1,7 +1,8 @@
 from dash import html, dcc, Input, Output, State, callback, clientside_callback, MATCH, ClientsideFunction, get_app
 from typing import Dict, List
 
-from dash_bootstrap_templates import load_figure_template
+from dash_bootstrap_templates import _stylesheet_template_names, load_figure_template
+from ._utils import add_theme_boot_script, graph_templates, theme_storage_key
 import dash_bootstrap_components as dbc
 import uuid
 
@@ -16,8 +17,11 @@ dbc_dark_themes = ["CYBORG", "DARKLY", "SLATE", "SOLAR", "SUPERHERO", "VAPOR"]
 
 
 def template_from_url(url):
-    """ returns the name of the plotly template for the Bootstrap stylesheet url"""
-    return url_dbc_themes.get(url, "bootstrap").lower()
+    """ returns the name of the plotly template for the Bootstrap stylesheet url, or for a custom stylesheet
+    whose templates were made with template_from_css"""
+    if url in url_dbc_themes:
+        return url_dbc_themes[url].lower()
+    return _stylesheet_template_names.get(url.split("/")[-1], "bootstrap")
 
 
 class ThemeChangerAIO(html.Div):
@@ -47,6 +51,11 @@ class ThemeChangerAIO(html.Div):
             "subcomponent": "assetsPath",
             "aio_id": aio_id,
         }
+        config = lambda aio_id: {
+            "component": "ThemeChangerAIO",
+            "subcomponent": "config",
+            "aio_id": aio_id,
+        }
 
     ids = ids
 
@@ -58,6 +67,9 @@ class ThemeChangerAIO(html.Div):
             radio_props: Dict[str, any] = None,
             button_props: Dict[str, any] = None,
             offcanvas_props: Dict[str, any] = None,
+            stylesheet_cache_size: int = 5,
+            persistence: bool = False,
+            graph_class_name: str = None,
     ):
 
         """ThemeChangerAIO is an All-in-One component  composed  of a parent `html.Div` with
@@ -67,7 +79,7 @@ class ThemeChangerAIO(html.Div):
         - `dbc.Offcanvas` ("`offcanvas`")
         - `dbc.RadioItems` ("`radio`").  The themes are displayed as RadioItems inside the `dbc.Offcanvas` component.
           The `value` is a url for the theme
-        - Two `dcc.Store` used as `Input` of the clientside callbacks to provide the theme list and the assets path.
+        - Three `dcc.Store` used in the clientside callbacks to provide the theme list, the assets path and the config.
 
         The ThemeChangerAIO component updates the stylesheet  when the `value` of radio changes. (ie the user selects a new theme)
 
@@ -77,7 +89,20 @@ class ThemeChangerAIO(html.Div):
         - param: `aio_id` The All-in-One component ID used to generate components' dictionary IDs.
         - param: `custom_themes` A dictionary of local .css files or external url
             with the keys being the theme name and the value being the theme path (file name in assets folder or url).
+            Use `template_from_css` to make the figure templates of the local themes.
         - param: `custom_dark_themes` List of custom dark theme name, so that they appear with a black background in the offcanvas list.
+        - param: `stylesheet_cache_size` The number of previously selected themes kept in the page as disabled stylesheets,
+            so that switching back to one of them is instant. The least recently used ones are removed. Default 5.
+        - param: `persistence` If True, the selected theme is saved in the browser's localStorage with the `aio_id` as key.
+            When the page is loaded again, the saved theme is applied before the page is first displayed, without
+            downloading the theme of the app's stylesheets, and the `value` of the radio is restored. Use a fixed
+            `aio_id` with this option. Default False.
+        - param: `graph_class_name` The class name of the `dcc.Graph` components (or of elements that contain them)
+            whose figure template is updated in the browser when the theme changes, without a callback. The template for
+            each theme is found with `template_from_url`, and is fetched from the app's server when it is first used.
+            The figure prop of graphs with an id is updated with `dash_clientside.set_props`. For graphs without an id
+            and with Dash < 2.16 only the drawn figure changes: the next figure from the server brings back its
+            template, and `relayoutData` gets the template. Default None.
 
         The All-in-One component dictionary IDs are available as:
 
@@ -86,7 +111,7 @@ class ThemeChangerAIO(html.Div):
         - ThemeChangerAIO.ids.button(aio_id)
         """
         # make all dash_bootstrap_templates templates available to plotly figures
-        load_figure_template("all")
+        load_figure_template("all", lazy=True)
 
         # concat custom themes and bootstrap themes
         themes_url = {**custom_themes, **dbc_themes_url} if custom_themes else dbc_themes_url
@@ -109,6 +134,9 @@ class ThemeChangerAIO(html.Div):
         # set default params if they don't exist
         radio_props.setdefault("options", [{'label': k, 'value': v} for k, v in themes_url.items()])
         radio_props.setdefault("value", dbc.themes.BOOTSTRAP)
+        if persistence:
+            radio_props.setdefault("persistence", aio_id)
+            radio_props.setdefault("persistence_type", "local")
         # add label styling to make the difference between light/dark themes
         for option in radio_props['options']:
             option.setdefault(
@@ -128,11 +156,26 @@ class ThemeChangerAIO(html.Div):
             dbc.RadioItems(id=self.ids.radio(aio_id), **radio_props),
         ])
 
+        app = get_app()
+        if persistence:
+            add_theme_boot_script(app, themes_url.values())
+
+        config = {
+            "cacheSize": stylesheet_cache_size,
+            "storageKey": theme_storage_key(app, aio_id) if persistence else None,
+            "graphClassName": graph_class_name,
+        }
+        if graph_class_name:
+            config.update(graph_templates(app, {
+                option["value"]: template_from_url(option["value"]) for option in radio_props["options"]
+            }))
+
         super().__init__([
             dbc.Button(id=self.ids.button(aio_id), **button_props),
             dbc.Offcanvas(id=self.ids.offcanvas(aio_id), **offcanvas_props),
             dcc.Store(id=self.ids.store(aio_id), data=themes_url),
-            dcc.Store(id=self.ids.assetsPath(aio_id), data=get_app().config.assets_url_path)
+            dcc.Store(id=self.ids.assetsPath(aio_id), data=app.config.assets_url_path),
+            dcc.Store(id=self.ids.config(aio_id), data=config),
         ])
 
     @callback(
@@ -144,74 +187,10 @@ class ThemeChangerAIO(html.Div):
         return not is_open if n1 else is_open
 
     clientside_callback(
-        """
-        function (selected_theme, themes, assetsUrlPath) {
-
-            // function to test if the theme is an external or a local theme
-            const isValidHttpUrl = (theme) => {
-                try {
-                    new URL(theme);
-                    return true;
-                } catch (error) {
-                    return false;
-                }
-            }
-        
-            // Find the existing theme stylesheets
-            let stylesheets = []
-            Object.values(themes).forEach(
-
-                url => stylesheets.push(...document.querySelectorAll(`link[rel='stylesheet'][href*='${url}']`))
-            );
-
-            // Create a new stylesheet link element
-            let newStylesheet = document.createElement("link");
-            newStylesheet.rel = "stylesheet";
-            newStylesheet.href = isValidHttpUrl(selected_theme)
-                ? selected_theme
-                : `/${assetsUrlPath}/${selected_theme.split('/').at(-1)}`;
-
-
-            // When the new stylesheet is loaded, remove the old ones
-            newStylesheet.onload = function () {
-
-                stylesheets.forEach(s => s.remove());
-            }
-
-            // Append the new stylesheet to the document head
-            document.head.appendChild(newStylesheet);
-
-            return window.dash_clientside.no_update;
-        }
-        """,
+        ClientsideFunction(namespace="dash_bootstrap_templates", function_name="themeChanger"),
         Output(ids.store(MATCH), "id"),
         Input(ids.radio(MATCH), "value"),
         Input(ids.store(MATCH), "data"),
-        State(ids.assetsPath(MATCH), "data")
-    )
-
-    # This callback is used to bundle custom CSS with the AIO component. This only runs once when the app starts.
-    # The clientside function adds the css to a <style> element and appends it to the <head>.
-    # Dash requires callbacks to have an Output even if there is nothing to update.
-    clientside_callback(
-        """
-        function(id) {
-            let style = document.createElement('style')
-            style.innerText = `
-                #theme-switch-label-dark {
-                    background-color: black;
-                    color: white;
-                    width: 100px
-                }                
-                #theme-switch-label {
-                    background-color: white;
-                    color: black;
-                    width: 100px
-                }
-            `
-            document.head.appendChild(style)
-        }
-        """,
-        Output(ids.offcanvas(MATCH), "id"),
-        Input(ids.offcanvas(MATCH), "id"),
+        State(ids.assetsPath(MATCH), "data"),
+        State(ids.config(MATCH), "data"),
     )
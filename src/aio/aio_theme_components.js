@@ -0,0 +1,205 @@
+/*
+ * The clientside callbacks of the ThemeSwitchAIO and ThemeChangerAIO components.
+ * This file is served with the components' other resources, so the browser caches it.
+ */
+(function () {
+
+    // test if the theme is an external or a local theme
+    const isValidHttpUrl = (theme) => {
+        try {
+            new URL(theme);
+            return true;
+        } catch (error) {
+            return false;
+        }
+    }
+
+    // Set the template of the figure of a graph.  The figure prop of the dcc.Graph is updated with set_props,
+    // so the next figure sent by the server doesn't bring the old template back, and relayoutData isn't changed.
+    // Graphs without an id and older Dash versions only get the template in the drawn figure.
+    const setGraphTemplate = (graph, template) => {
+        // the root element of the dcc.Graph, which has the id of the component
+        const component = graph.parentElement
+        if (!component || !component.id || !window.dash_clientside.set_props) {
+            window.Plotly.relayout(graph, {template: template})
+            return
+        }
+        // the DOM id of a component with a dict id is the id as json
+        const id = component.id.startsWith('{') ? JSON.parse(component.id) : component.id
+        window.dash_clientside.set_props(id, {
+            figure: {data: graph.data, layout: Object.assign({}, graph.layout, {template: template})}
+        })
+    }
+
+    // Update the figure template of the graphs in the elements with the config.graphClassName class.
+    // The templates are fetched from the app's server (see serve_templates), or are in the config
+    const updateGraphTemplates = (config, theme) => {
+        if (!config || !config.graphClassName || !window.Plotly) {
+            return
+        }
+        const name = config.templateNames[theme]
+        const updateGraphs = template => document.querySelectorAll(
+            `.${config.graphClassName} .js-plotly-plot`
+        ).forEach(graph => setGraphTemplate(graph, template))
+        if (config.templates && config.templates[name]) {
+            updateGraphs(config.templates[name])
+        } else if (config.templateUrls && config.templateUrls[name]) {
+            fetch(config.templateUrls[name]).then(response => response.json()).then(updateGraphs)
+        }
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        dash_bootstrap_templates: {
+            themeSwitch: function (switchOn, themes, assetsUrlPath, config) {
+
+                const selectedTheme = switchOn ? themes[0] : themes.toReversed()[0]
+
+                // Update the figure template of the graphs in the elements with the config.graphClassName class
+                updateGraphTemplates(config, selectedTheme)
+
+                // if local themes are used, modify the path to the clientside path
+                themes = themes.map(theme => isValidHttpUrl(theme) ? theme : `/${assetsUrlPath}/${theme.split('/').at(-1)}`)
+
+                // Find the stylesheets
+                let stylesheets = []
+                for (const theme of themes) {
+                    stylesheets.push(...document.querySelectorAll(`link[rel='stylesheet'][href*='${theme}']`))
+                }
+                let newTheme = switchOn ? themes[0] : themes.toReversed()[0]
+
+                // Save the theme, so it's applied before the page is displayed the next time it's loaded
+                if (config && config.storageKey) {
+                    localStorage.setItem(config.storageKey, JSON.stringify({theme: newTheme, themes: themes}))
+                }
+
+                if (config && config.preload) {
+                    // Keep a stylesheet for each theme, and only enable the selected one.
+                    // The stylesheets added by the switch are marked, to remove them if the themes are changed.
+                    stylesheets = [...new Set([
+                        ...stylesheets, ...document.querySelectorAll("link[rel='stylesheet'][data-theme-switch]")
+                    ])]
+                    const isNewTheme = s => s.getAttribute('href') === newTheme
+                    let stylesheet = stylesheets.find(isNewTheme)
+                    const disableOthers = () => stylesheets.filter(s => !isNewTheme(s)).forEach(
+                        s => s.sheet && themes.includes(s.getAttribute('href')) ? s.sheet.disabled = true : s.remove()
+                    )
+                    if (stylesheet && stylesheet.sheet) {
+                        stylesheet.sheet.disabled = false
+                        disableOthers()
+                    } else if (!stylesheet) {
+                        stylesheet = document.createElement("link")
+                        stylesheet.rel = "stylesheet"
+                        stylesheet.href = newTheme
+                        stylesheet.dataset.themeSwitch = true
+                        // the other theme stays enabled until this one is loaded, so the page is never unstyled
+                        stylesheet.onload = disableOthers
+                        document.head.appendChild(stylesheet)
+                    }
+
+                    // Preload the other theme, so that the first toggle doesn't wait on the network
+                    for (const theme of themes) {
+                        if (theme !== newTheme && !document.querySelector(`link[href='${theme}']`)) {
+                            let preloadLink = document.createElement("link")
+                            preloadLink.rel = "preload"
+                            preloadLink.as = "style"
+                            preloadLink.href = theme
+                            document.head.appendChild(preloadLink)
+                        }
+                    }
+                    return window.dash_clientside.no_update
+                }
+
+                // Clean if there are several themes stylesheets applied or create one if no stylesheet is found
+                // keep the first stylesheet
+                let stylesheet = stylesheets[0]
+                // and clean if more than one stylesheet are found
+                for (let i = 1; i < stylesheets.length; i++) {
+                    stylesheets[i].remove()
+                }
+                // or create a new one if no stylesheet found
+                if (!stylesheet) {
+                    stylesheet = document.createElement("link")
+                    stylesheet.rel = "stylesheet"
+                    document.head.appendChild(stylesheet)
+                }
+
+                // Update the theme
+                if (stylesheet.getAttribute('href') !== newTheme) {
+                    stylesheet.setAttribute('href', newTheme)
+                }
+                return window.dash_clientside.no_update
+            },
+
+            themeChanger: function (selected_theme, themes, assetsUrlPath, config) {
+
+                const toHref = theme => isValidHttpUrl(theme) ? theme : `/${assetsUrlPath}/${theme.split('/').at(-1)}`
+                const href = toHref(selected_theme);
+
+                // Save the theme, so it's applied before the page is displayed the next time it's loaded
+                if (config.storageKey) {
+                    localStorage.setItem(
+                        config.storageKey,
+                        JSON.stringify({theme: href, themes: Object.values(themes).map(toHref)})
+                    )
+                }
+
+                // Update the figure template of the graphs in the elements with the config.graphClassName class
+                updateGraphTemplates(config, selected_theme)
+
+                // Find the existing theme stylesheets, including the disabled ones kept from previous selections
+                const findStylesheets = () => {
+                    let stylesheets = []
+                    Object.values(themes).forEach(
+                        url => stylesheets.push(...document.querySelectorAll(`link[rel='stylesheet'][href*='${url}']`))
+                    );
+                    return stylesheets
+                }
+                const isSelected = s => s.getAttribute('href') === href || s.href === new URL(href, document.baseURI).href
+
+                // Disable the stylesheets that are not the selected theme, and remove the least recently used ones
+                // when there are more than config.cacheSize
+                const disableOthers = (selected) => {
+                    let cached = findStylesheets().filter(s => s !== selected)
+                    cached.forEach(s => s.sheet ? s.sheet.disabled = true : s.remove())
+                    cached = cached.filter(s => s.isConnected)
+                    cached.sort((a, b) => (b.dataset.lastUsed || 0) - (a.dataset.lastUsed || 0))
+                    cached.slice(config.cacheSize).forEach(s => s.remove())
+                }
+
+                let stylesheets = findStylesheets()
+                let stylesheet = stylesheets.find(isSelected)
+                stylesheets.forEach(s => s.dataset.selected = s === stylesheet)
+                if (stylesheet) {
+                    // The theme was already loaded, so switch to it without fetching it again
+                    stylesheet.dataset.lastUsed = Date.now()
+                    if (stylesheet.sheet) {
+                        stylesheet.sheet.disabled = false
+                        disableOthers(stylesheet)
+                    }
+                    return window.dash_clientside.no_update;
+                }
+
+                // Create a new stylesheet link element
+                let newStylesheet = document.createElement("link");
+                newStylesheet.rel = "stylesheet";
+                newStylesheet.href = href;
+                newStylesheet.dataset.selected = true;
+                newStylesheet.dataset.lastUsed = Date.now();
+
+                // When the new stylesheet is loaded, disable the old ones, unless another theme was selected meanwhile
+                newStylesheet.onload = function () {
+                    if (newStylesheet.dataset.selected === "true") {
+                        disableOthers(newStylesheet)
+                    } else {
+                        newStylesheet.sheet.disabled = true
+                    }
+                }
+
+                // Append the new stylesheet to the document head
+                document.head.appendChild(newStylesheet);
+
+                return window.dash_clientside.no_update;
+            },
+        },
+    });
+})();
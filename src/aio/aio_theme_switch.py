@@ -1,9 +1,13 @@
 from typing import Union, List, Tuple, Dict
 from dash import html, dcc, Input, Output, clientside_callback, MATCH, ClientsideFunction, get_app, State
 from dash_bootstrap_templates import load_figure_template
+from ._utils import add_theme_boot_script, graph_templates, theme_storage_key
+from .aio_theme_changer import template_from_url
 import dash_bootstrap_components as dbc
 import uuid
 
+FONT_AWESOME = "https://use.fontawesome.com/releases/v5.15.4/css/all.css"
+
 
 class ThemeSwitchAIO(html.Div):
     class ids:
@@ -32,6 +36,11 @@ class ThemeSwitchAIO(html.Div):
             "subcomponent": "assetsPath",
             "aio_id": aio_id,
         }
+        config = lambda aio_id: {
+            "component": "ThemeSwitchAIO",
+            "subcomponent": "config",
+            "aio_id": aio_id,
+        }
 
     ids = ids
 
@@ -41,6 +50,9 @@ class ThemeSwitchAIO(html.Div):
             themes: Union[Tuple[str, str], List[str]] = (dbc.themes.CYBORG, dbc.themes.BOOTSTRAP),
             icons=None,
             switch_props: Dict[str, any] = None,
+            preload: bool = False,
+            persistence: bool = False,
+            graph_class_name: str = None,
     ):
         """ThemeSwitchAIO is an All-in-One component composed of a parent `html.Div` with
         the following components as children:
@@ -58,6 +70,18 @@ class ThemeSwitchAIO(html.Div):
         - param: `icons`  A dict of the icons to the left and right of the switch. The default is
             `{"left" :"fa fa-moon", "right" :"fa fa-sun"}`.
         - param: `aio_id` The All-in-One component ID used to generate components' dictionary IDs.
+        - param: `preload` If True, the other theme is preloaded when the page loads, and both stylesheets are kept in
+            the page once used.  Toggling the switch then only changes which stylesheet is enabled. Default False.
+        - param: `persistence` If True, the selected theme is saved in the browser's localStorage with the `aio_id` as key.
+            When the page is loaded again, the saved theme is applied before the page is first displayed, without
+            downloading the theme of the app's stylesheets, and the `value` of the switch is restored. Use a fixed
+            `aio_id` with this option. Default False.
+        - param: `graph_class_name` The class name of the `dcc.Graph` components (or of elements that contain them)
+            whose figure template is updated in the browser when the theme changes, without a callback. The template for
+            each theme is found with `template_from_url`, and is fetched from the app's server when it is first used.
+            The figure prop of graphs with an id is updated with `dash_clientside.set_props`. For graphs without an id
+            and with Dash < 2.16 only the drawn figure changes: the next figure from the server brings back its
+            template, and `relayoutData` gets the template. Default None.
 
         The All-in-One component dictionary IDs are available as
 
@@ -75,11 +99,15 @@ class ThemeSwitchAIO(html.Div):
         # set "value" and "className" if they don't exist
         switch_props.setdefault("value", True)
         switch_props.setdefault("className", "d-inline-block ms-1")
+        if persistence:
+            switch_props.setdefault("persistence", aio_id)
+            switch_props.setdefault("persistence_type", "local")
 
         # add fontawesome resource for the icons, in first position so that if the user uses another version,
-        # it will override this version
+        # it will override this version. It's only added once, however many switches there are.
         app = get_app()
-        app.config.external_stylesheets.insert(0, "https://use.fontawesome.com/releases/v5.15.4/css/all.css")
+        if FONT_AWESOME not in app.config.external_stylesheets:
+            app.config.external_stylesheets.insert(0, FONT_AWESOME)
 
         # If using custom themes in assets_folder, filter them out to not be automatically imported by Dash
         # and let the switch handle them. Add "|" if assets_ignore has already regex rules.
@@ -88,8 +116,19 @@ class ThemeSwitchAIO(html.Div):
         for theme in themes:
             app.config.assets_ignore += f'{"|" if app.config.assets_ignore else ""}{theme.split("/")[-1]}'
 
+        if persistence:
+            add_theme_boot_script(app, themes)
+
+        config = {
+            "preload": preload,
+            "storageKey": theme_storage_key(app, aio_id) if persistence else None,
+            "graphClassName": graph_class_name,
+        }
+        if graph_class_name:
+            config.update(graph_templates(app, {theme: template_from_url(theme) for theme in themes}))
+
         # make all dash_bootstrap_templates templates available to plotly figures
-        load_figure_template('all')
+        load_figure_template("all", lazy=True)
 
         super().__init__(
             [
@@ -101,54 +140,16 @@ class ThemeSwitchAIO(html.Div):
                     ],
                 ),
                 dcc.Store(id=self.ids.store(aio_id), data=themes),
-                dcc.Store(id=self.ids.assetsPath(aio_id), data=app.config.assets_url_path)
+                dcc.Store(id=self.ids.assetsPath(aio_id), data=app.config.assets_url_path),
+                dcc.Store(id=self.ids.config(aio_id), data=config),
             ]
         )
 
     clientside_callback(
-        """
-        function (switchOn, themes, assetsUrlPath) {
-
-            // function to test if the theme is an external or a local theme
-            const isValidHttpUrl = (theme) => {
-                try {
-                    new URL(theme);
-                    return true;
-                } catch (error) {
-                    return false;
-                }
-            }
-
-            // if local themes are used, modify the path to the clientside path
-            themes = themes.map(theme => isValidHttpUrl(theme) ? theme : `/${assetsUrlPath}/${theme.split('/').at(-1)}`)
-
-            // Clean if there are several themes stylesheets applied or create one if no stylesheet is found
-            // Find the stylesheets
-            let stylesheets = []
-            for (const theme of themes) {
-                stylesheets.push(...document.querySelectorAll(`link[rel='stylesheet'][href*='${theme}']`))
-            }
-            // keep the first stylesheet
-            let stylesheet = stylesheets[0]
-            // and clean if more than one stylesheet are found
-            for (let i = 1; i < stylesheets.length; i++) {
-                stylesheets[i].remove()
-            }
-            // or create a new one if no stylesheet found
-            if (!stylesheet) {
-                stylesheet = document.createElement("link")
-                stylesheet.rel = "stylesheet"
-                document.head.appendChild(stylesheet)
-            }
-
-            // Update the theme
-            let newTheme = switchOn ? themes[0] : themes.toReversed()[0]
-            stylesheet.setAttribute('href', newTheme)
-            return window.dash_clientside.no_update
-        }
-        """,
+        ClientsideFunction(namespace="dash_bootstrap_templates", function_name="themeSwitch"),
         Output(ids.store(MATCH), "id"),
         Input(ids.switch(MATCH), "value"),
         Input(ids.store(MATCH), "data"),
         State(ids.assetsPath(MATCH), "data"),
+        State(ids.config(MATCH), "data"),
     )
@@ -1,5 +1,14 @@
 import json
+import os
+import pathlib
+import pickle
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 
+import plotly
 import plotly.io as pio
 
 try:
@@ -8,34 +17,63 @@ except ImportError:
     # if using Python 3.8 or lower import from the backport
     from importlib_resources import files
 
-try:
-    from importlib.metadata import (
-        PackageNotFoundError,
-        version,
-    )
-except ModuleNotFoundError:
-    # if using Python 3.7, import from the backport
-    from importlib_metadata import (
-        PackageNotFoundError,
-        version,
-    )
-    
-from packaging import version as packaging_version
+# asyncio, concurrent.futures, importlib.metadata and the aio components (which import dash) are
+# imported when first used, to keep `import dash_bootstrap_templates` fast (checked by _import_time.py)
 
 min_version = "6.0.0"
 max_version = "7.0.0"
-plotly_version = version("plotly")
-parse_min_version = packaging_version.parse("6.0.0")
-parse_max_version = packaging_version.parse("7.0.0")
-parse_plotly_version = packaging_version.parse(plotly_version)
-if not (parse_min_version <= parse_plotly_version < parse_max_version):
+plotly_version = plotly.__version__
+
+
+def _parse_version(version_str):
+    """Returns the leading release numbers of a version string as a tuple of ints, ie "6.1.0rc1" -> (6, 1, 0)"""
+    return tuple(int(n) for n in re.match(r"\d+(?:\.\d+)*", version_str).group().split("."))
+
+
+if not (_parse_version(min_version) <= _parse_version(plotly_version) < _parse_version(max_version)):
     raise ImportError(f"Incompatible Plotly version: {plotly_version}. Expected >={min_version}, <{max_version}.\n")
 
-try:
-    __version__ = version("dash_bootstrap_templates")
-except PackageNotFoundError:
-    # package is not installed
-    pass
+
+@lru_cache(maxsize=None)
+def _package_version():
+    """Returns the installed version of dash-bootstrap-templates, or None if the package is not installed"""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ModuleNotFoundError:
+        # if using Python 3.7, import from the backport
+        from importlib_metadata import PackageNotFoundError, version
+    try:
+        return version("dash_bootstrap_templates")
+    except PackageNotFoundError:
+        return None
+
+
+# names imported from other modules on first access
+_lazy_imports = {
+    "ThemeSwitchAIO": "aio",
+    "ThemeChangerAIO": "aio",
+    "template_from_url": "aio",
+    "update_graph_templates": "aio",
+    "serve_templates": "dash_bootstrap_templates._routes",
+    "template_url": "dash_bootstrap_templates._routes",
+    "template_reference": "dash_bootstrap_templates._references",
+    "use_template_references": "dash_bootstrap_templates._references",
+    "template_patch": "dash_bootstrap_templates._patches",
+    "template_from_css": "dash_bootstrap_templates._css_templates",
+}
+
+
+def __getattr__(name):
+    if name == "__version__":
+        if _package_version() is not None:
+            return _package_version()
+    elif name in _lazy_imports:
+        import importlib
+
+        globals()[name] = getattr(importlib.import_module(_lazy_imports[name]), name)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 """
 Use this function to make the bootstrap figure templates available in your Dash app
@@ -72,47 +110,390 @@ dbc_templates = [
 ]
 
 
-def read_template(theme):
+class _LazyTemplate:
+    """Placeholder registered in plotly.io.templates until the template is first used"""
+
+    __slots__ = ("theme",)
+
+    def __init__(self, theme):
+        self.theme = theme
+
+    def __repr__(self):
+        return f"<lazy dash-bootstrap-template {self.theme!r}>"
+
+
+class _TemplatesConfig(type(pio.templates)):
+    """
+    plotly.io.templates that reads and validates lazily registered templates on first lookup,
+    and whose default template can be set for the current context only with use_template()
+    """
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            for template_name in item.split("+"):
+                if isinstance(self._templates.get(template_name), _LazyTemplate):
+                    with _registry_lock:
+                        # another thread may have loaded it while we waited for the lock
+                        template = self._templates.get(template_name)
+                        if isinstance(template, _LazyTemplate):
+                            _register(template_name, _validated_template(template.theme))
+        return super().__getitem__(item)
+
+    @property
+    def default(self):
+        template = _context_template.get()
+        return self._default if template is None else template
+
+    default = default.setter(type(pio.templates).default.fset)
+
+
+pio.templates.__class__ = _TemplatesConfig
+
+# all the templates in a single file, see _bundle.py
+BUNDLE_NAME = "bundle.pickle"
+_bundle_templates = None
+# parsed json templates, keyed by theme name and package version
+_template_cache = {}
+# json templates made from custom stylesheets by template_from_css(), keyed by template name
+_custom_templates = {}
+# the name of the templates made from each custom stylesheet, keyed by the stylesheet's file name
+_stylesheet_template_names = {}
+# templates (or lazy placeholders) added to plotly.io.templates by this package
+_registered_templates = {}
+# the last warm_up() call
+_warm_up_future = None
+# aload_figure_template() loads in progress, keyed by event loop and theme name
+_pending_loads = {}
+# held while adding templates to plotly.io.templates
+_registry_lock = threading.RLock()
+# the default template set by use_template() in the current thread or task
+_context_template = ContextVar("dash_bootstrap_templates_default", default=None)
+
+
+def _register(theme, template):
+    with _registry_lock:
+        pio.templates._templates[theme] = template
+        _registered_templates[theme] = template
+
+
+def _is_registered(theme):
+    """True if the template added by this package is still the one in plotly.io.templates"""
+    template = pio.templates._templates.get(theme)
+    return template is not None and template is _registered_templates.get(theme)
+
+
+def _set_default(theme):
+    if pio.templates._default != theme:
+        pio.templates.default = theme
+
+
+def _read_bundle():
+    """Returns the dict of pickled templates in the bundle, or {} if the package has no bundle"""
+    global _bundle_templates
+    if _bundle_templates is None:
+        try:
+            _bundle_templates = pickle.loads((files("dash_bootstrap_templates") / "templates" / BUNDLE_NAME).read_bytes())
+        except IOError:
+            _bundle_templates = {}
+    return _bundle_templates
+
+
+def _read_template_file(name):
+    bundle = _read_bundle()
+    if name in bundle:
+        return pickle.loads(bundle[name])
+    path = files("dash_bootstrap_templates") / "templates"
+    # base templates are in the templates/base folder
+    for part in name.split("/")[:-1]:
+        path = path / part
+    with (path / f"{name.split('/')[-1]}.json").open() as f:
+        return json.load(f)
+
+
+def _merge_template(base, overlay):
+    """Returns base updated with overlay. The parts of base that are not in overlay are shared, not copied."""
+    if not (isinstance(base, dict) and isinstance(overlay, dict)):
+        return overlay
+    merged = dict(base)
+    for key, value in overlay.items():
+        merged[key] = _merge_template(base[key], value) if key in base else value
+    return merged
+
+
+def _read_template_dict(theme):
+    if theme in _custom_templates:
+        return _custom_templates[theme]
+    key = (theme, _package_version())
+    if key in _template_cache:
+        return _template_cache[key]
     try:
-        with (
-                files("dash_bootstrap_templates") / "templates" / f"{theme}.json"
-        ).open() as f:
-            template = json.load(f)
+        template = _read_template_file(theme)
     except IOError:
-        with (
-                files("dash_bootstrap_templates") / "templates" / "bootstrap.json"
-        ).open() as f:
-            template = json.load(f)
-    pio.templates[theme] = template
+        template = _read_template_file("bootstrap")
+    if "_base" in template:
+        # Templates are stored as the changes made to a plotly base template, so that all the
+        # templates made from the same base share its trace defaults instead of each having a copy.
+        overlay = {k: v for k, v in template.items() if k != "_base"}
+        template = _merge_template(_read_template_dict(f"base/{template['_base']}"), overlay)
+    _template_cache[key] = template
+    return template
+
+
+def read_template(theme, lazy=False):
+    with _registry_lock:
+        if _is_registered(theme):
+            return
+        if lazy:
+            # the json file is read and validated the first time pio.templates[theme] is looked up
+            _register(theme, _LazyTemplate(theme))
+        else:
+            _register(theme, _validated_template(theme))
 
 
-def load_figure_template(themes="bootstrap"):
+def _read_templates(themes):
+    """Read the templates that are not added yet on a thread pool, then validate and add them all at once"""
+    themes = [theme for theme in dict.fromkeys(themes) if not _is_registered(theme)]
+    if len(themes) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(
+                max_workers=min(len(themes), 8), thread_name_prefix="dash_bootstrap_templates_read"
+        ) as executor:
+            templates = list(executor.map(_read_template_dict, themes))
+    else:
+        templates = [_read_template_dict(theme) for theme in themes]
+    with _registry_lock:
+        for theme, template in zip(themes, templates):
+            if not _is_registered(theme):
+                _register(theme, pio.templates._validate(template))
+
+
+def load_figure_template(themes="bootstrap", lazy=False):
     """Add figure template to plotly.io and sets the default template
 
     Keyword arguments:
-    themes -- may be a string or list of strings. (Default "bootstrap")
+    themes -- may be a string or an iterable of strings, such as a list or tuple. (Default "bootstrap")
               - The string is the lowercase name of a Bootstrap theme
               "all" will load all 52 themes.
+    lazy -- if True, the templates are only added to plotly.io as placeholders.
+            Each template is read and validated the first time it is used
+            in a figure. (Default False)
 
     The plotly.io.templates.default will be the first theme if
     themes is a list. If the themes attribute is invalid, the
     "bootstrap" theme will be used.
+
+    Templates that were already added by a previous call are not read or
+    validated again.  When several templates are loaded, the files are read
+    in parallel.
+    """
+    names = _theme_names(themes)
+    if lazy:
+        for theme in names:
+            read_template(theme, lazy)
+    else:
+        _read_templates(names)
+    _set_default("bootstrap" if themes == "all" else names[0])
+
+
+def _is_loaded(theme):
+    return _is_registered(theme) and not isinstance(pio.templates._templates[theme], _LazyTemplate)
+
+
+def _validated_template(theme):
+    return pio.templates._validate(_read_template_dict(theme))
+
+
+def _pending_load(loop, theme):
+    """Returns the future of the load of theme in loop's default executor, starting it if it isn't in progress"""
+    key = (loop, theme)
+    future = _pending_loads.get(key)
+    if future is None:
+        future = loop.run_in_executor(None, _validated_template, theme)
+        _pending_loads[key] = future
+        future.add_done_callback(lambda f: _pending_loads.pop(key, None))
+    return future
+
+
+async def aload_figure_template(themes="bootstrap"):
+    """Add figure template to plotly.io and sets the default template, without blocking the event loop
+
+    This is the asyncio version of load_figure_template(), for apps that run on an event loop.
+    The templates are read and validated in the event loop's default executor, and are then all
+    added to plotly.io at once.  Coroutines that load the same theme at the same time share a
+    single load.
+
+    Keyword arguments:
+    themes -- may be a string or an iterable of strings, like in load_figure_template. (Default "bootstrap")
     """
-    if type(themes) is list:
-        for theme in themes:
-            read_template(theme)
-        pio.templates.default = themes[0]
+    import asyncio
+
+    names = _theme_names(themes)
+    loop = asyncio.get_running_loop()
+    themes_to_load = [theme for theme in dict.fromkeys(names) if not _is_loaded(theme)]
+    # shield the shared loads, so that cancelling one caller doesn't cancel the others
+    templates = await asyncio.gather(*[asyncio.shield(_pending_load(loop, theme)) for theme in themes_to_load])
+    with _registry_lock:
+        for theme, template in zip(themes_to_load, templates):
+            if not _is_loaded(theme):
+                _register(theme, template)
+    _set_default("bootstrap" if themes == "all" else names[0])
+
+
+def _theme_names(themes):
+    if themes == "all":
+        return [name for theme in dbc_templates for name in (theme, f"{theme}_dark")]
+    if isinstance(themes, str):
+        return [themes]
+    return list(themes)
+
+
+def _template_names():
+    """The names of all the templates of the package and of the templates made by template_from_css()"""
+    return _theme_names("all") + list(_custom_templates)
 
-    elif themes == "all":
-        for theme in dbc_templates:
-            read_template(theme)
-            read_template(f"{theme}_dark")
-        pio.templates.default = "bootstrap"
 
+def _warm_up_templates(themes):
+    for theme in themes:
+        with _registry_lock:
+            if not _is_loaded(theme):
+                _register(theme, _validated_template(theme))
 
+
+def warm_up(themes="all", background=True):
+    """Read and validate figure templates ahead of time, so that the first figure using a theme doesn't have to
+
+    Keyword arguments:
+    themes -- may be a string or list of strings, like in load_figure_template. (Default "all")
+    background -- if True, the templates are prepared on a worker thread and warm_up returns
+                  immediately. (Default True)
+
+    Templates that are not yet in plotly.io are added. Unlike load_figure_template,
+    the plotly.io.templates.default is not changed.
+
+    Returns a concurrent.futures.Future that is done when all the templates are ready.
+    Use wait_for_warm_up() to check if the last warm-up is complete, for example in
+    a readiness probe.
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    global _warm_up_future
+    themes = _theme_names(themes)
+    if background:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dash_bootstrap_templates_warm_up")
+        future = executor.submit(_warm_up_templates, themes)
+        executor.shutdown(wait=False)
     else:
-        read_template(themes)
-        pio.templates.default = themes
+        future = Future()
+        _warm_up_templates(themes)
+        future.set_result(None)
+    _warm_up_future = future
+    return future
+
+
+def wait_for_warm_up(timeout=None):
+    """Wait up to timeout seconds for the last warm_up() to finish.
+
+    Returns True if the templates are ready (or warm_up was never called), and False if
+    the warm-up is still running.  A warm-up that failed raises its exception.
+    Use timeout=0 to check without waiting.
+    """
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    future = _warm_up_future
+    if future is None:
+        return True
+    try:
+        future.result(timeout)
+    except FutureTimeoutError:
+        return False
+    return True
 
 
-from aio import ThemeSwitchAIO, ThemeChangerAIO, template_from_url
+@contextmanager
+def use_template(template):
+    """Use template as the default figure template in the current thread or asyncio task only
+
+    Unlike setting plotly.io.templates.default, this does not change the default template of
+    other callbacks running at the same time in a threaded server:
+
+        @callback(Output("graph", "figure"), Input("theme", "value"))
+        def update(theme):
+            with use_template(template_from_url(theme)):
+                return px.scatter(df, x="gdpPercap", y="lifeExp")
+
+    It can also be used as a decorator: `@use_template("minty")`.
+    The template may be the name of any registered template, or names joined with "+".
+    """
+    if isinstance(template, str):
+        # raise a KeyError for an unknown template, and load lazily registered templates
+        pio.templates[template]
+    token = _context_template.set(template)
+    try:
+        yield
+    finally:
+        _context_template.reset(token)
+
+
+def _default_cache_dir():
+    cache_dir = pathlib.Path(os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache"))
+    return cache_dir / "dash_bootstrap_templates"
+
+
+def _snapshot_path(cache_dir=None):
+    if cache_dir is None:
+        cache_dir = _default_cache_dir()
+    package_version = _package_version() or "dev"
+    return pathlib.Path(cache_dir) / f"templates-{package_version}-plotly-{plotly_version}.pickle"
+
+
+def save_template_snapshot(cache_dir=None):
+    """Save the validated figure templates added by this package, so they can be restored with load_template_snapshot()
+
+    Keyword arguments:
+    cache_dir -- the folder for the snapshot file.  (Default "~/.cache/dash_bootstrap_templates")
+
+    The snapshot file is named with the dash-bootstrap-templates and plotly versions, so it is
+    only restored by the same versions. Templates that were loaded lazily are validated first.
+
+    Returns the path of the snapshot file.
+    """
+    templates = {}
+    for theme in list(_registered_templates):
+        if _is_registered(theme):
+            templates[theme] = pio.templates[theme].to_plotly_json()
+    path = _snapshot_path(cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first so that another process never reads a partial snapshot
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(templates, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_template_snapshot(cache_dir=None):
+    """Add the figure templates saved by save_template_snapshot() to plotly.io
+
+    Keyword arguments:
+    cache_dir -- the folder of the snapshot file.  (Default "~/.cache/dash_bootstrap_templates")
+
+    The templates were validated when the snapshot was saved, so they are restored without
+    validating them again, which is much faster than load_figure_template(). With a preloading
+    server such as `gunicorn --preload`, call it before the workers are forked so that they
+    share the templates.
+
+    Returns True if a snapshot for the installed dash-bootstrap-templates and plotly versions
+    was found and loaded, and False otherwise.  The plotly.io.templates.default is not changed.
+    """
+    from plotly.graph_objs.layout import Template
+
+    try:
+        with open(_snapshot_path(cache_dir), "rb") as f:
+            templates = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return False
+    for theme, template in templates.items():
+        _register(theme, Template(template, _validate=False))
+    return True
+
@@ -0,0 +1,112 @@
+"""
+Storage of the json figure templates.
+
+The templates made from a plotly base template (see _create_templates.py) are saved as the
+changes made to that base, with the name of the base in the "_base" key.  The base templates
+are saved in the templates/base folder and are merged with the changes when a template is read.
+
+The templates are also packed into a single file, so that they can all be loaded with one read.
+
+The bundle is a pickled dict of {theme name: pickled template dict}.  Only the entries
+that are used are unpickled.
+
+Run this after the json templates are updated:
+    $ python -m dash_bootstrap_templates._bundle
+
+To compare loading all the templates from the json files and from the bundle:
+    $ python -m dash_bootstrap_templates._bundle --benchmark
+"""
+
+import json
+import pathlib
+import pickle
+import sys
+import timeit
+
+from dash_bootstrap_templates import BUNDLE_NAME, _merge_template
+
+# protocol 4 can be read by all supported Python versions
+BUNDLE_PROTOCOL = 4
+
+TEMPLATES_PATH = pathlib.Path(__file__).parent.joinpath("templates")
+
+
+def _overlay(base, template):
+    """Returns the parts of template that are different from base"""
+    overlay = {}
+    for key, value in template.items():
+        if key not in base:
+            overlay[key] = value
+        elif isinstance(value, dict) and isinstance(base[key], dict):
+            changes = _overlay(base[key], value)
+            if changes:
+                overlay[key] = changes
+        elif value != base[key]:
+            overlay[key] = value
+    return overlay
+
+
+def template_overlay(template, bases):
+    """
+    Returns the template as the changes made to the base template that it's closest to.
+    `bases` is a dict of {name: base template dict}. The template is returned unchanged
+    if it can't be rebuilt from any of the bases (ie it doesn't have all of a base's keys)
+    """
+    overlays = []
+    for name, base in bases.items():
+        overlay = _overlay(base, template)
+        if _merge_template(base, overlay) == template:
+            overlays.append({"_base": name, **overlay})
+    if not overlays:
+        return template
+    return min(overlays, key=lambda overlay: len(json.dumps(overlay)))
+
+
+def build_bundle(templates_path=TEMPLATES_PATH):
+    templates_path = pathlib.Path(templates_path)
+    bundle = {}
+    for path in sorted(templates_path.glob("base/*.json")) + sorted(templates_path.glob("*.json")):
+        with open(path) as f:
+            bundle[path.relative_to(templates_path).with_suffix("").as_posix()] = pickle.dumps(
+                json.load(f), protocol=BUNDLE_PROTOCOL
+            )
+    return bundle
+
+
+def write_bundle(templates_path=TEMPLATES_PATH):
+    bundle = build_bundle(templates_path)
+    data = pickle.dumps(bundle, protocol=BUNDLE_PROTOCOL)
+    path = pathlib.Path(templates_path).joinpath(BUNDLE_NAME)
+    # only write the bundle when it changed
+    if not path.exists() or path.read_bytes() != data:
+        path.write_bytes(data)
+    return len(bundle)
+
+
+def benchmark(number=20, templates_path=TEMPLATES_PATH):
+    templates_path = pathlib.Path(templates_path)
+    names = [path.stem for path in sorted(templates_path.glob("*.json"))]
+
+    def load_json():
+        for name in names:
+            with open(templates_path.joinpath(f"{name}.json")) as f:
+                json.load(f)
+
+    def load_bundle():
+        with open(templates_path.joinpath(BUNDLE_NAME), "rb") as f:
+            bundle = pickle.load(f)
+        for name in names:
+            pickle.loads(bundle[name])
+
+    json_time = min(timeit.repeat(load_json, number=1, repeat=number))
+    bundle_time = min(timeit.repeat(load_bundle, number=1, repeat=number))
+    print(f"{len(names)} templates")
+    print(f"json files: {json_time * 1000:.2f} ms")
+    print(f"bundle:     {bundle_time * 1000:.2f} ms  ({json_time / bundle_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+    else:
+        print(f"{write_bundle()} templates saved in {TEMPLATES_PATH.joinpath(BUNDLE_NAME)}")
@@ -0,0 +1,265 @@
+"""
+The colors of the figure templates made from the Bootstrap stylesheets (see build.py).
+Based on the dash-labs figure templates: https://github.com/plotly/dash-labs v0.4.0
+"""
+
+import re
+
+import numpy as np
+
+try:
+    import spectra
+except ImportError:
+    msg = (
+        "Generating plotly.py figure templates from bootstrap theme files requires\n"
+        "the optional spectra package, which can be installed using pip...\n"
+        "    $ pip install dash-bootstrap-templates[css]\n"
+        "or conda...\n"
+        "    $ conda install -c conda-forge spectra"
+    )
+    raise ImportError(msg)
+
+
+# The colors are converted with NumPy, using the same formulas and constants as the colormath conversions
+# that spectra uses, so that the colorways are the same as when they were made with spectra.
+CIE_E = 216.0 / 24389.0
+D50_WHITE = np.array([0.96422, 1.00000, 0.82521])
+D65_WHITE = np.array([0.95047, 1.00000, 1.08883])
+RGB_TO_XYZ = np.array(
+    [
+        [0.412424, 0.357579, 0.180464],
+        [0.212656, 0.715158, 0.0721856],
+        [0.0193324, 0.119193, 0.950444],
+    ]
+)
+XYZ_TO_RGB = np.array(
+    [
+        [3.24071, -1.53726, -0.498571],
+        [-0.969258, 1.87599, 0.0415557],
+        [0.0556352, -0.203996, 1.05707],
+    ]
+)
+# Bradford chromatic adaptation from the D50 to the D65 white point
+BRADFORD = np.array([[0.8951, 0.2664, -0.1614], [-0.7502, 1.7135, 0.0367], [0.0389, -0.0685, 1.0296]])
+D50_TO_D65 = np.linalg.pinv(BRADFORD) @ np.diag((BRADFORD @ D65_WHITE) / (BRADFORD @ D50_WHITE)) @ BRADFORD
+
+# white and black are Lab colors, the other colors are sRGB colors
+WHITE = np.array([100.0, 0.0, 0.0])
+BLACK = np.array([0.0, 0.0, 0.0])
+
+
+def rgb_to_lab(rgb):
+    """sRGB values (0-1) to CIE Lab with a D65 white point. Colors are in the last axis of the array."""
+    rgb = np.asarray(rgb, dtype=float)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, (np.maximum(rgb + 0.055, 0) / 1.055) ** 2.4)
+    xyz = np.maximum(linear @ RGB_TO_XYZ.T, 0.0) / D65_WHITE
+    f = np.where(xyz > CIE_E, np.cbrt(xyz), 7.787 * xyz + 16.0 / 116.0)
+    return np.stack(
+        [116.0 * f[..., 1] - 16.0, 500.0 * (f[..., 0] - f[..., 1]), 200.0 * (f[..., 1] - f[..., 2])], axis=-1
+    )
+
+
+def lab_to_rgb(lab):
+    """CIE Lab with a D50 white point to sRGB values, not clamped to 0-1"""
+    lab = np.asarray(lab, dtype=float)
+    y = (lab[..., 0] + 16.0) / 116.0
+    f = np.stack([lab[..., 1] / 500.0 + y, y, y - lab[..., 2] / 200.0], axis=-1)
+    xyz = np.where(f**3 > CIE_E, f**3, (f - 16.0 / 116.0) / 7.787) * D50_WHITE
+    linear = np.maximum(xyz @ D50_TO_D65.T @ XYZ_TO_RGB.T, 0.0)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def lab_to_lch(lab):
+    hue = np.degrees(np.arctan2(lab[..., 2], lab[..., 1]))
+    hue = np.where(hue > 0, hue, 360 - np.abs(hue))
+    return np.stack([lab[..., 0], np.hypot(lab[..., 1], lab[..., 2]), hue], axis=-1)
+
+
+def lch_to_lab(lch):
+    hue = np.radians(lch[..., 2])
+    return np.stack([lch[..., 0], np.cos(hue) * lch[..., 1], np.sin(hue) * lch[..., 1]], axis=-1)
+
+
+def darken(colors, is_lab, amounts):
+    """
+    Darken the colors by decreasing their lightness in the LCH color space, like spectra's Color.darken.
+    `is_lab` is True for the Lab colors and False for the sRGB colors, which stay in their color space.
+    """
+    colors = np.asarray(colors, dtype=float)
+    is_lab = np.asarray(is_lab)[..., None]
+    lch = lab_to_lch(np.where(is_lab, colors, rgb_to_lab(colors)))
+    lch[..., 0] -= amounts
+    lab = lch_to_lab(lch)
+    return np.where(is_lab, lab, lab_to_rgb(lab))
+
+
+def to_rgb255(colors, is_lab):
+    """The 0-255 sRGB values of the colors' hexcodes"""
+    colors = np.asarray(colors, dtype=float)
+    rgb = np.where(np.asarray(is_lab)[..., None], lab_to_rgb(colors), colors)
+    return np.floor(0.5 + np.clip(rgb, 0.0, 1.0) * 255).astype(int)
+
+
+def to_hexcodes(colors, is_lab):
+    return ["#%02x%02x%02x" % tuple(rgb) for rgb in to_rgb255(colors, is_lab).reshape(-1, 3)]
+
+
+def delta_e_cie94(lab1, lab2, K_1=0.045, K_2=0.015):
+    """The CIE94 (graphic arts) color difference of lab1 and lab2, for arrays of colors that broadcast together"""
+    C_1 = np.sqrt(lab1[..., 1] ** 2 + lab1[..., 2] ** 2)
+    C_2 = np.sqrt(lab2[..., 1] ** 2 + lab2[..., 2] ** 2)
+    delta_L = lab1[..., 0] - lab2[..., 0]
+    delta_C = C_1 - C_2
+    delta_H_sq = -(delta_C**2) + (lab1[..., 1] - lab2[..., 1]) ** 2 + (lab1[..., 2] - lab2[..., 2]) ** 2
+    delta_H = np.sqrt(np.clip(delta_H_sq, 0, None))
+    return np.sqrt(delta_L**2 + (delta_C / (1 + K_1 * C_1)) ** 2 + (delta_H / (1 + K_2 * C_1)) ** 2)
+
+
+def color_distance(rgb255_1, rgb255_2):
+    """The distance between colors given as 0-255 sRGB values"""
+    return delta_e_cie94(rgb_to_lab(np.asarray(rgb255_1) / 255), rgb_to_lab(np.asarray(rgb255_2) / 255))
+
+
+# Distance matrix
+def color_distance_matrix(colors):
+    lab = rgb_to_lab(np.array([to_rgb_tuple(clr) for clr in colors]) / 255)
+    return delta_e_cie94(lab[None, :], lab[:, None]).astype("float32")
+
+
+def best_darkening(c1, c2, is_lab, c1_step=(1, 1), c2_step=(1, 1)):
+    """
+    The distance and the darkening of ONE of the colors c1 and c2 that separates them the most.
+    `is_lab` is a pair of booleans: True if the color is a Lab color.
+    """
+    steps = [(0, 0), (c1_step[1], 0), (c1_step[0], 0), (0, c2_step[1]), (0, c2_step[0])]
+    darkened1 = darken(np.array([c1, c1]), is_lab[0], np.array(c1_step[::-1]))
+    darkened2 = darken(np.array([c2, c2]), is_lab[1], np.array(c2_step[::-1]))
+    colors1 = to_rgb255(np.array([c1, *darkened1, c1, c1]), is_lab[0])
+    colors2 = to_rgb255(np.array([c2, c2, c2, *darkened2]), is_lab[1])
+    distances = color_distance(colors1, colors2)
+
+    # Return step with sign that increases distance most
+    # Return 0 if either step lower distance
+    return sorted(zip(distances, steps))[-1]
+
+
+def separate_colorway(html_colors):
+
+    try:
+        raw_colors = [[c / 255 for c in to_rgb_tuple(clr)] for clr in html_colors]
+    except ValueError:
+        # Unable to parse colors as hex or rgb, return as-is
+        return html_colors
+
+    test_colors = np.array([WHITE] + raw_colors + [BLACK])
+    is_lab = np.array([True] + [False] * len(raw_colors) + [True])
+
+    darkenings = np.zeros(len(test_colors))
+    threshold = 36
+
+    max_shift = 16
+    max_step = 16
+    max_iterations = 4
+    max_step_factor = 0.9
+
+    iterations = 0
+    distances = np.ones((len(html_colors) + 2, len(html_colors) + 2)) * np.nan
+
+    while iterations < max_iterations:
+        for i in range(len(test_colors) - 1):
+            c1 = darken(test_colors[i], is_lab[i], darkenings[i])
+            # the darkening of the colors after i only changes once they have been compared with c1,
+            # so the distances to all of them are computed at once
+            others = darken(test_colors[i + 1 :], is_lab[i + 1 :], darkenings[i + 1 :])
+            row_distances = color_distance(to_rgb255(c1, is_lab[i]), to_rgb255(others, is_lab[i + 1 :]))
+            for j, c2, distance in zip(range(i + 1, len(test_colors)), others, row_distances):
+                distances[i, j] = distance
+
+                # When comparing to black and white,
+                # skip if at least threshold units away
+                if distance > threshold:
+                    continue
+
+                # Compute max step based on how close colors are
+                this_step = max_step * ((100 - distance) / 100) ** 2
+
+                # Clamp max steps based on how close we are to max shift allowances
+                c1_step_up = max(0, min(this_step, max_shift - darkenings[i]))
+                c2_step_up = max(0, min(this_step, max_shift - darkenings[j]))
+                c1_step_down = min(0, max(-this_step, -darkenings[i] - max_shift))
+                c2_step_down = min(0, max(-this_step, -darkenings[j] - max_shift))
+
+                # Compute best way to lighten or darken ONE of the colors (not both)
+                distance, (delta1, delta2) = best_darkening(
+                    c1,
+                    c2,
+                    (is_lab[i], is_lab[j]),
+                    c1_step=(c1_step_down, c1_step_up),
+                    c2_step=(c2_step_down, c2_step_up),
+                )
+                distances[i, j] = distance
+
+                darkenings[i] += delta1
+                darkenings[j] += delta2
+
+        iterations += 1
+        max_step *= max_step_factor
+
+    return to_hexcodes(darken(test_colors, is_lab, darkenings)[1:-1], is_lab[1:-1])
+
+
+def hex_to_rgb(clr):
+    clr = clr.lstrip("#")
+    if len(clr) == 3:
+        clr = "".join(c[0] * 2 for c in clr)
+    return tuple(int(clr[i : i + 2], 16) for i in (0, 2, 4))
+
+
+def to_rgb_tuple(color):
+    from plotly.colors import unlabel_rgb
+
+    if isinstance(color, tuple):
+        pass
+    elif color.startswith("#"):
+        color = hex_to_rgb(color)
+    else:
+        color = unlabel_rgb(color)
+
+    return tuple(int(c) for c in color)
+
+
+def make_grid_color(bg_color, font_color, weight=0.1):
+    bg_color = to_rgb_tuple(bg_color)
+    font_color = to_rgb_tuple(font_color)
+
+    s_bg_color = spectra.rgb(*[c / 255 for c in bg_color])
+    s_font_color = spectra.rgb(*[c / 255 for c in font_color])
+    return s_bg_color.blend(s_font_color, weight).hexcode
+
+
+def maybe_blend(base_color, overlay_color):
+    """
+    Try to blend semi transparent overlay color on opaque
+    base color. Return None if not successful
+    """
+    try:
+        bc = spectra.html(base_color).to("rgb")
+    except ValueError:
+        return None
+
+    try:
+        # If overlay color is hex code or named color, it's
+        # opaque, return as is
+        return spectra.html(overlay_color).hexcode
+    except ValueError:
+        # Otherwise, it might be rgba
+        pass
+
+    rgba_match = re.match(r"rgba\(([^,]+),([^,]+),([^,]+),([^,]+)\)", overlay_color)
+    if rgba_match is None:
+        return None
+
+    r, g, b, a = [float(n) for n in rgba_match.groups()]
+    overlay_rgb = spectra.rgb(r / 255, g / 255, b / 255)
+    blended = overlay_rgb.blend(bc, 1 - a)
+    return blended.hexcode
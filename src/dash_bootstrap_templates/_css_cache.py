@@ -0,0 +1,103 @@
+"""
+On-disk cache of the stylesheets fetched to build the templates (see build.py).
+
+The stylesheets are saved by the sha256 of their content in `<cache dir>/css/<sha256>.css`.  For each url,
+`<cache dir>/css/urls/<sha256 of the url>.json` has the ETag and Last-Modified headers of the response and
+the sha256 of the content, so the next request only downloads the stylesheet if it changed.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import warnings
+from urllib.parse import urlparse
+
+from dash_bootstrap_templates import _default_cache_dir
+
+# seconds to wait for the server
+REQUEST_TIMEOUT = 30
+
+
+def sha256(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class CSSCache:
+    def __init__(self, cache_dir=None):
+        self.path = pathlib.Path(cache_dir if cache_dir is not None else _default_cache_dir()) / "css"
+
+    def _content_path(self, digest):
+        return self.path / f"{digest}.css"
+
+    def _url_path(self, url):
+        return self.path / "urls" / f"{sha256(url)}.json"
+
+    def _cached(self, url):
+        """Returns the saved headers and content of the url, or (None, None)"""
+        try:
+            with open(self._url_path(url)) as f:
+                entry = json.load(f)
+            with open(self._content_path(entry["sha256"]), "rb") as f:
+                content = f.read()
+        except (OSError, ValueError, KeyError):
+            return None, None
+        if sha256(content) != entry["sha256"]:
+            return None, None
+        return entry, content
+
+    def fetch(self, url, session=None):
+        """
+        Returns the text of the stylesheet at the url or local path.
+        Raises ValueError if the stylesheet can't be fetched and isn't in the cache.
+        """
+        if not urlparse(url).scheme:
+            # Local file
+            with open(url, "rb") as f:
+                return f.read().decode("utf8")
+
+        import requests
+
+        entry, content = self._cached(url)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = (session or requests).get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            if content is None:
+                raise ValueError(f"Unable to fetch the stylesheet {url}: {e}") from e
+            warnings.warn(f"Unable to fetch the stylesheet {url}, using the cached copy: {e}")
+            return content.decode("utf8")
+
+        if response.status_code == 304 and content is not None:
+            return content.decode("utf8")
+        if response.status_code != 200:
+            raise ValueError(f"Unable to fetch the stylesheet {url}: HTTP {response.status_code}")
+
+        content = response.content
+        digest = sha256(content)
+        if not self._content_path(digest).exists():
+            _write_atomic(self._content_path(digest), content)
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": digest,
+        }
+        _write_atomic(self._url_path(url), json.dumps(entry, indent=2).encode("utf-8"))
+        return content.decode("utf8")
@@ -0,0 +1,131 @@
+"""
+Figure templates made at runtime from the stylesheet of a custom Bootstrap theme (see template_from_css).
+
+The templates are made by the same code as the templates of the package (see build.py), which needs the package
+in the `css` extra.  They are cached in memory and on disk by the sha256 of the stylesheet and of the code that
+makes them, so each stylesheet is converted once and not every time the app starts.
+"""
+
+import pathlib
+import pickle
+import sys
+from functools import lru_cache
+from urllib.parse import urlparse
+
+from dash_bootstrap_templates import (
+    _custom_templates,
+    _default_cache_dir,
+    _register,
+    _registry_lock,
+    _stylesheet_template_names,
+    _validated_template,
+)
+
+
+def _assets_folder():
+    """The assets folder of the Dash app, or ./assets if there is no app yet"""
+    try:
+        from dash import get_app
+
+        return get_app().config.assets_folder
+    except Exception:
+        return "assets"
+
+
+def _read_stylesheet(css, assets_folder):
+    """Returns the css text, or the text of the stylesheet at the path or in the assets folder"""
+    if "{" in css:
+        return css
+    if urlparse(css).scheme in ("http", "https"):
+        raise ValueError(
+            f"template_from_css needs a local stylesheet or css text, not the url {css!r}. "
+            "Save the stylesheet in the assets folder."
+        )
+    path = pathlib.Path(css)
+    if not path.is_file():
+        path = pathlib.Path(assets_folder or _assets_folder()) / path.name
+    with open(path, "rb") as f:
+        return f.read().decode("utf8")
+
+
+def _cache_path(css_text, cache_dir):
+    from dash_bootstrap_templates._css_cache import sha256
+    from dash_bootstrap_templates.build import generator_hash
+
+    key = sha256(f"{sha256(css_text)}-{generator_hash()}")
+    return pathlib.Path(cache_dir if cache_dir is not None else _default_cache_dir()) / "css_templates" / f"{key}.pickle"
+
+
+# the functions that cache something made from a template, keyed by the template name
+_TEMPLATE_CACHES = {
+    "dash_bootstrap_templates._routes": "_template_response_data",
+    "dash_bootstrap_templates._references": "template_reference",
+    "dash_bootstrap_templates._patches": "template_patch",
+    "aio._graph_templates": "_template_assign_patch",
+}
+
+
+def _clear_template_caches():
+    """Forget what was made from the previous templates, when a template is replaced"""
+    for module_name, function_name in _TEMPLATE_CACHES.items():
+        if module_name in sys.modules:
+            getattr(sys.modules[module_name], function_name).cache_clear()
+
+
+@lru_cache(maxsize=32)
+def _templates_from_css_text(css_text, cache_dir=None):
+    """Returns the json dicts of the light and dark templates of the stylesheet: {template name suffix: template}"""
+    from dash_bootstrap_templates._css_cache import _write_atomic
+    from dash_bootstrap_templates.build import build_theme_templates
+
+    path = _cache_path(css_text, cache_dir)
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    templates = build_theme_templates(css_text)
+    _write_atomic(path, pickle.dumps(templates, protocol=pickle.HIGHEST_PROTOCOL))
+    return templates
+
+
+def template_from_css(name, css, assets_folder=None, cache_dir=None):
+    """Make the light and dark figure templates of a Bootstrap stylesheet and add them to plotly.io
+
+    Keyword arguments:
+    name -- the name of the light template.  The dark template is named f"{name}_dark".
+    css -- the path of a local stylesheet, the name of a stylesheet in the assets folder, or the css text.
+    assets_folder -- the folder of the stylesheets. (Default: the assets folder of the Dash app)
+    cache_dir -- the folder where the templates are saved. (Default "~/.cache/dash_bootstrap_templates")
+
+    The templates are made like the templates of the Bootstrap themes, from the colors and fonts of the
+    stylesheet's :root, [data-bs-theme=dark] and .card rules.  They are cached in memory and in cache_dir
+    by the content of the stylesheet and of the code that makes them, so a stylesheet is only converted
+    again when it changes or when a new version of the package makes the templates differently.  Use a
+    cache_dir that is part of the deployed app to convert the stylesheets once per deploy.
+
+    When css is a stylesheet file, template_from_url returns the template name for it, so that the
+    ThemeChangerAIO `custom_themes` have a matching figure template:
+
+        template_from_css("my_theme", "my_theme.css")
+        ThemeChangerAIO(aio_id="theme", custom_themes={"my_theme": "my_theme.css"})
+
+    Making the templates requires the spectra package of the `css` extra: `pip install dash-bootstrap-templates[css]`
+
+    Returns the name of the light template.  Raises ValueError if the stylesheet has no Bootstrap variables.
+    """
+    css_text = _read_stylesheet(css, assets_folder)
+    templates = _templates_from_css_text(css_text, None if cache_dir is None else pathlib.Path(cache_dir))
+    with _registry_lock:
+        replaced = False
+        for suffix, template in templates.items():
+            if _custom_templates.get(f"{name}{suffix}") is template:
+                continue
+            replaced = replaced or f"{name}{suffix}" in _custom_templates
+            _custom_templates[f"{name}{suffix}"] = template
+            _register(f"{name}{suffix}", _validated_template(f"{name}{suffix}"))
+        if replaced:
+            _clear_template_caches()
+        if "{" not in css:
+            _stylesheet_template_names[pathlib.PurePath(css).name] = name
+    return name
@@ -0,0 +1,485 @@
+"""
+Plotly figure templates made from the colors and fonts of a Bootstrap stylesheet (see build.py).
+Based on the dash-labs figure templates: https://github.com/plotly/dash-labs v0.4.0
+"""
+
+import copy
+import re
+import sys
+import timeit
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from dash_bootstrap_templates._colors import make_grid_color, maybe_blend, separate_colorway
+import spectra
+
+COLOR_MODES = ("light", "dark")
+
+# The rules read to make the templates, the other rules of the stylesheet are skipped
+TEMPLATE_SELECTORS = (":root", "[data-bs-theme=dark]", ".card")
+
+# What changes the structure of the stylesheet: comments, strings, urls, escapes, parentheses, blocks and the end
+# of @ statements.  The ; in `@import url(...;...);` is in parentheses, so it doesn't end the statement.
+_STRUCTURE = re.compile(r"/\*|(?<![\w-])url\(|[\"'\\(){};]", re.IGNORECASE)
+# The same in the content of a rule, plus the whitespace that is dropped between the tokens
+_CONTENT_STRUCTURE = re.compile(r"[ \t\n\r\f]+|/\*|(?<![\w-])url\(|[\"'\\()\[\]{}]", re.IGNORECASE)
+# The spaces after `url(`, then an unquoted url
+_URL_START = re.compile(r"[ \t\n\r\f]*")
+_STRING_BODY = {
+    '"': re.compile(r'(?:[^"\\\n]|\\[\s\S])*'),
+    "'": re.compile(r"(?:[^'\\\n]|\\[\s\S])*"),
+}
+
+
+def _skip_comment(css_text, pos):
+    end = css_text.find("*/", pos)
+    return len(css_text) if end < 0 else end + 2
+
+
+def _skip_string(css_text, pos, quote):
+    """Returns the position after the string that starts at pos, after its opening quote"""
+    return _STRING_BODY[quote].match(css_text, pos).end() + 1
+
+
+def _skip_unquoted_url(css_text, pos):
+    """
+    Returns the position after an unquoted url that starts at pos, after `url(`, or None if the url is quoted.
+    Like in tinycss2, the body of an unquoted url has no comments, strings or blocks.
+    """
+    start = _URL_START.match(css_text, pos).end()
+    if css_text[start : start + 1] in ('"', "'"):
+        return None
+    end = css_text.find(")", start)
+    return len(css_text) if end < 0 else end + 1
+
+
+def _top_level_rules(css_text, selectors):
+    """
+    Yields the (selectors, content) of the top level rules that have one of the selectors.
+    The content of the other rules and of the @ rules is skipped by only looking for the end of their block.
+    """
+    pos = 0
+    depth = 0
+    # the depth of the parentheses in the prelude of a top level rule
+    parens = 0
+    prelude_start = 0
+    content_start = 0
+    wanted = ()
+    while True:
+        match = _STRUCTURE.search(css_text, pos)
+        if match is None:
+            return
+        token = match.group()
+        pos = match.end()
+        if token.lower() == "url(":
+            url_end = _skip_unquoted_url(css_text, pos)
+            if url_end is not None:
+                pos = url_end
+            elif depth == 0:
+                parens += 1
+        elif token in "()":
+            if depth == 0:
+                parens = parens + 1 if token == "(" else max(parens - 1, 0)
+        elif token == "/*":
+            pos = _skip_comment(css_text, pos)
+            if depth == 0 and not css_text[prelude_start : match.start()].strip():
+                # a comment between rules isn't part of the next rule
+                prelude_start = pos
+        elif token in "\"'":
+            pos = _skip_string(css_text, pos, token)
+        elif token == "\\":
+            pos += 1
+        elif token == "{":
+            if depth == 0:
+                parens = 0
+                prelude = css_text[prelude_start : match.start()]
+                wanted = tuple(s for s in (s.strip() for s in prelude.split(",")) if s in selectors)
+                content_start = pos
+            depth += 1
+        elif token == "}":
+            if depth == 1 and wanted:
+                yield wanted, css_text[content_start : match.start()]
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                prelude_start = pos
+                parens = 0
+        elif depth == 0 and parens == 0 and css_text[prelude_start:pos].lstrip().startswith("@"):
+            # the end of a statement like @charset or @import
+            prelude_start = pos
+
+
+def _serialize_string(string):
+    """Strings are serialized with double quotes, like tinycss2 does"""
+    if string[0] == "'" and '"' not in string and "\\" not in string:
+        return f'"{string[1:-1]}"'
+    return string
+
+
+def _joined_content(content):
+    """
+    Returns the content of a rule with the whitespace between its tokens removed, which is how
+    parse_all_rules_from_bootstrap_css joins the serialized tokens of the content.
+    """
+    parts = []
+    pos = 0
+    depth = 0
+    while True:
+        match = _CONTENT_STRUCTURE.search(content, pos)
+        if match is None:
+            parts.append(content[pos:])
+            return "".join(parts)
+        token = match.group()
+        parts.append(content[pos : match.start()])
+        pos = match.end()
+        if token.lower() == "url(":
+            url_end = _skip_unquoted_url(content, pos)
+            if url_end is None:
+                depth += 1
+                parts.append(token)
+            else:
+                pos = url_end
+                parts.append(content[match.start() : pos])
+        elif token == "/*":
+            pos = _skip_comment(content, pos)
+            parts.append(content[match.start() : pos])
+        elif token in "\"'":
+            pos = _skip_string(content, pos, token)
+            parts.append(_serialize_string(content[match.start() : pos]))
+        elif token == "\\":
+            pos += 1
+            parts.append(content[match.start() : pos])
+        elif token[0] in " \t\n\r\f":
+            if depth:
+                parts.append(token)
+        else:
+            depth = depth + 1 if token in "([{" else max(depth - 1, 0)
+            parts.append(token)
+
+
+def _declarations(joined_content):
+    """Returns the (property, value) pairs of the joined content of a rule"""
+    for entry in joined_content.split(";"):
+        prop_pair = entry.split(":")
+        if len(prop_pair) == 2:
+            yield prop_pair[0], prop_pair[1].replace("!important", "").strip()
+
+
+def parse_rules_from_bootstrap_css(css_text, color_mode=None, selectors=TEMPLATE_SELECTORS):
+    """
+    Returns a dict of {css selector: {css property: value}} for the selectors used to make the templates.
+    With a color_mode, the :root properties are the ones of that color mode (see rules_for_color_mode).
+
+    Only the rules of the selectors are parsed, the rest of the stylesheet is skipped.  The rules are the
+    same as the ones of parse_all_rules_from_bootstrap_css, which parses the whole stylesheet with tinycss2.
+    """
+    rule_props = {}
+    for rule_selectors, content in _top_level_rules(css_text, selectors):
+        property_pairs = list(_declarations(_joined_content(content)))
+        for selector in rule_selectors:
+            for prop_key, prop_value in property_pairs:
+                rule_props.setdefault(selector, {})[prop_key] = prop_value
+
+    if color_mode is None:
+        return rule_props
+    return rules_for_color_mode(rule_props, color_mode)
+
+
+def parse_all_rules_from_bootstrap_css(css_text, color_mode=None):
+    """
+    Returns a dict of {css selector: {css property: value}} for all the rules of the stylesheet.
+    With a color_mode, the :root properties are the ones of that color mode (see rules_for_color_mode).
+    This is the reference for parse_rules_from_bootstrap_css.
+    """
+    import tinycss2
+
+    tinycss_parsed = tinycss2.parse_stylesheet(css_text)
+
+    # Build dict from css selectors to dict of css prop-values
+    rule_props = {}
+    for token in tinycss_parsed:
+        if token.type != "qualified-rule":
+            continue
+        rule = token
+        selector_str = "".join([t.serialize() for t in rule.prelude])
+        selectors = tuple(s.strip() for s in selector_str.split(","))
+        property_strings = [
+            entry
+            for entry in "".join([c.serialize().strip() for c in rule.content]).split(
+                ";"
+            )
+            if entry
+        ]
+
+        property_pairs = [prop_str.split(":") for prop_str in property_strings]
+        for selector in selectors:
+            for prop_pair in property_pairs:
+                if len(prop_pair) != 2:
+                    continue
+                rule_props.setdefault(selector, {})
+                prop_key = prop_pair[0]
+                prop_value = prop_pair[1].replace("!important", "").strip()
+                rule_props[selector][prop_key] = prop_value
+
+    if color_mode is None:
+        return rule_props
+    return rules_for_color_mode(rule_props, color_mode)
+
+
+def rules_for_color_mode(rule_props, color_mode):
+    """Returns the parsed rules with the :root properties of the color mode, without changing rule_props"""
+    rule_props = {**rule_props, ":root": dict(rule_props.get(":root", {}))}
+    if color_mode == "dark":
+        rule_props[":root"].update(rule_props.get("[data-bs-theme=dark]", {}))
+    return rule_props
+
+
+# Get title font color
+def get_font(rule_props):
+    color = rule_props.get(":root", {}).get("--bs-body-color", "#000")
+    family = rule_props.get(":root", {}).get("--bs-font-sans-serif", "sans-serif")
+    return color, family
+
+
+def get_role_colors(rule_props):
+    # Initialize role_colors with default values
+    role_colors = {
+        "primary": "#007bff",
+        "secondary": "#6c757d",
+        "success": "#28a745",
+        "info": "#17a2b8",
+        "warning": "#ffc107",
+        "danger": "#dc3545",
+        "light": "#f8f9fa",
+        "dark": "#343a40",
+    }
+
+    # Override with role colors for current theme
+    for prop, val in rule_props.get(":root", {}).items():
+        if prop.startswith("--bs-"):
+            maybe_color = prop[5:]
+            if maybe_color in role_colors:
+                role_colors[maybe_color] = val
+
+    return role_colors
+
+
+def get_colorscale(color_a, color_b):
+
+   # A range between 'primary' and 'warning'
+    color1=spectra.html(color_a)
+    color2=spectra.html(color_b).brighten(20)
+
+
+    # A range of primary colors
+    # color1 = spectra.html(color_a).brighten(-20)
+    # color2 = spectra.html(color_a).brighten(40)
+
+    scale = np.linspace(0, 1, 11)
+    theme_swatches = spectra.range([color1, color2], 11)
+    return [[k,v.hexcode] for k,v in zip(scale,theme_swatches)]
+
+
+def get_template(bg_color):
+    # spectra.lab(L, a, b)   L is lightness from 0 to 100
+    lightness =spectra.html(bg_color).to("lab").values[0]
+    if lightness < 50:
+        return copy.deepcopy(pio.templates["plotly_dark"])
+    else:
+        return copy.deepcopy(pio.templates["plotly_white"])
+
+
+def build_plotly_template_from_bootstrap_css_text(css_text, color_mode):
+    return build_plotly_template_from_rules(parse_rules_from_bootstrap_css(css_text, color_mode), css_text)
+
+
+def build_plotly_templates_from_bootstrap_css_text(css_text):
+    """Returns a dict of {color mode: template}. The css is only parsed once for all the color modes."""
+    rule_props = parse_rules_from_bootstrap_css(css_text)
+    return {
+        color_mode: build_plotly_template_from_rules(rules_for_color_mode(rule_props, color_mode), css_text)
+        for color_mode in COLOR_MODES
+    }
+
+
+def build_plotly_template_from_rules(rule_props, css_text):
+    """Builds the template from the css rules of one color mode, parsed from css_text"""
+    if not any(prop.startswith("--bs-") for selector in (":root", ".card") for prop in rule_props.get(selector, {})):
+        raise ValueError(
+            "The stylesheet has no Bootstrap --bs-* variables in its :root or .card rules, so it has no colors and "
+            "fonts to make a figure template from. Use a stylesheet made with Bootstrap 5."
+        )
+
+    # Initialize role_colors with default values
+    role_colors = get_role_colors(rule_props)
+
+    # Get font info
+    font_color, font_family = get_font(rule_props)
+
+    # Get background color
+    plot_bgcolor = rule_props.get(":root", {}).get("--bs-body-bg", "#fff")
+    paper_bgcolor = rule_props.get(".card", {}).get("--bs-card-bg", plot_bgcolor)
+
+    # The morph theme's card background color does not look good as the paper_bgcolor in dark mode
+    if "Theme: morph" in css_text:
+        paper_bgcolor = plot_bgcolor
+
+    blended = maybe_blend(plot_bgcolor, paper_bgcolor)
+    if blended is None:
+        # Can't blend, use background color for everything
+        paper_bgcolor = plot_bgcolor
+    else:
+        paper_bgcolor = blended
+
+    # Build colorway
+    colorway_roles = [
+        "primary",
+        "danger",
+        "success",
+        "warning",
+        "info",
+    ]
+    colorway = [role_colors[r] for r in colorway_roles]
+    colorway = separate_colorway(colorway)
+
+
+    colorscale = get_colorscale(role_colors["primary"], role_colors["danger"])
+
+    # Build grid color
+    gridcolor = make_grid_color(plot_bgcolor, font_color, 0.08)
+
+    # Make template
+    template = get_template(paper_bgcolor)
+
+    layout = template.layout
+    layout.colorway = colorway
+    layout.colorscale.sequential = colorscale
+    layout.piecolorway = colorway
+    layout.paper_bgcolor = paper_bgcolor
+    layout.plot_bgcolor = plot_bgcolor
+    layout.font.color = font_color
+    layout.font.family = font_family
+    layout.xaxis.gridcolor = gridcolor
+    layout.yaxis.gridcolor = gridcolor
+    layout.xaxis.gridwidth = 0.5
+    layout.yaxis.gridwidth = 0.5
+    layout.xaxis.zerolinecolor = gridcolor
+    layout.yaxis.zerolinecolor = gridcolor
+    layout.geo.bgcolor = plot_bgcolor
+    layout.geo.lakecolor = plot_bgcolor
+    layout.geo.landcolor = plot_bgcolor
+    layout.hoverlabel.font.family = font_family
+    layout.annotationdefaults.font.color = font_color
+
+    template.data.scatter = (go.Scatter(marker_line_color=plot_bgcolor),)
+    template.data.scattergl = (go.Scattergl(marker_line_color=plot_bgcolor),)
+
+    return template
+
+
+# The start of a Bootswatch stylesheet, with the structures that the rules scanner has to skip correctly: an @import
+# whose unquoted url has a ;, comments, strings and urls with braces, and the rules in @ blocks
+_CHECK_STYLESHEET = """@charset "UTF-8";/*!
+ * Bootswatch v5.2.3 (https://bootswatch.com)
+ * Theme: darkly
+ */@import url(https://fonts.googleapis.com/css2?family=Lato:ital,wght@0,400;0,700;1,400&display=swap);
+@import url( "https://example.com/a;b.css" );
+:root{--bs-primary:#375a7f;--bs-danger:#e74c3c;--bs-body-bg:#222;--bs-body-color:#fff;
+--bs-font-sans-serif:Lato, -apple-system, 'Segoe UI', Roboto;--bs-bg-img:url(data:image/png;base64,/*x*/)}
+.a::before{content:"}{;"}.b{background:url(x/*y;}.png)}
+@media (min-width:576px){.card{--bs-card-bg:red}:root{--bs-body-bg:#000}}
+.card{--bs-card-bg:#303030;--bs-card-cap-bg:rgba(255, 255, 255, 0.03) !important}
+[data-bs-theme=dark]{--bs-body-bg:#111}
+"""
+
+
+def _check_same_as_tinycss2(name, css_text):
+    """Raises ValueError if parse_rules_from_bootstrap_css and the tinycss2 parse find different rules"""
+    all_rules = parse_all_rules_from_bootstrap_css(css_text)
+    if parse_rules_from_bootstrap_css(css_text) != {s: all_rules[s] for s in TEMPLATE_SELECTORS if s in all_rules}:
+        raise ValueError(f"The rules of {name} are not the same as the ones parsed by tinycss2")
+
+
+def check(paths=()):
+    """
+    Checks that parse_rules_from_bootstrap_css finds the same rules as the tinycss2 parse of the whole stylesheet,
+    for a sample of a Bootswatch stylesheet and for the stylesheets at the paths.
+
+        $ python -m dash_bootstrap_templates._from_css --check [stylesheet paths]
+    """
+    rule_props = parse_rules_from_bootstrap_css(_CHECK_STYLESHEET)
+    expected = {
+        ":root": {
+            "--bs-primary": "#375a7f",
+            "--bs-body-bg": "#222",
+            "--bs-font-sans-serif": 'Lato,-apple-system,"Segoe UI",Roboto',
+        },
+        ".card": {"--bs-card-bg": "#303030", "--bs-card-cap-bg": "rgba(255, 255, 255, 0.03)"},
+        "[data-bs-theme=dark]": {"--bs-body-bg": "#111"},
+    }
+    for selector, props in expected.items():
+        for prop, value in props.items():
+            if rule_props.get(selector, {}).get(prop) != value:
+                raise ValueError(f"{selector} {prop} is {rule_props.get(selector, {}).get(prop)!r}, not {value!r}")
+    _check_same_as_tinycss2("the sample stylesheet", _CHECK_STYLESHEET)
+    for path in paths:
+        with open(path, "rb") as f:
+            _check_same_as_tinycss2(path, f.read().decode("utf8"))
+    print(f"{len(paths) + 1} stylesheets checked")
+
+
+def benchmark(css_texts, number=5):
+    """
+    Times parse_rules_from_bootstrap_css against the tinycss2 parse of the whole stylesheet, for the
+    stylesheets of {name: css text}, and checks that they find the same rules.
+    """
+    import tinycss2  # noqa: F401, imported before timing
+
+    def parse_all():
+        for css_text in css_texts.values():
+            parse_all_rules_from_bootstrap_css(css_text)
+
+    def parse_template_rules():
+        for css_text in css_texts.values():
+            parse_rules_from_bootstrap_css(css_text)
+
+    for name, css_text in css_texts.items():
+        _check_same_as_tinycss2(name, css_text)
+
+    size = sum(len(css_text) for css_text in css_texts.values())
+    all_time = min(timeit.repeat(parse_all, number=1, repeat=number))
+    template_time = min(timeit.repeat(parse_template_rules, number=1, repeat=number))
+    print(f"{len(css_texts)} stylesheets, {size / 1000:.0f} KB")
+    print(f"tinycss2:       {all_time * 1000:.2f} ms")
+    print(f"template rules: {template_time * 1000:.2f} ms  ({all_time / template_time:.1f}x)")
+
+
+def read_css(css_url):
+    """Returns the text of the stylesheet at the url or local path, or None if it can't be fetched"""
+    import requests
+    from urllib.parse import urlparse
+
+    parse_result = urlparse(css_url)
+    if parse_result.scheme:
+        # URL
+        response = requests.get(css_url)
+        if response.status_code != 200:
+            return None
+        return response.content.decode("utf8")
+    elif parse_result.path:
+        # Local file
+        with open(parse_result.path, "rt") as f:
+            return f.read()
+
+
+def try_build_plotly_template_from_bootstrap_css_path(css_url, color_mode="light"):
+    css_text = read_css(css_url)
+    if css_text is None:
+        return None
+    return build_plotly_template_from_bootstrap_css_text(css_text, color_mode)
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        check([arg for arg in sys.argv[1:] if arg != "--check"])
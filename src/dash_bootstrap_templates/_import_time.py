@@ -0,0 +1,60 @@
+"""
+Checks the time that `import dash_bootstrap_templates` adds to the import of plotly, with `python -X importtime`:
+
+    $ python -m dash_bootstrap_templates._import_time [--budget MILLISECONDS]
+
+plotly.io is imported first, since the package needs it anyway, so the time is only the package's own imports.
+The modules that the package imports on first use (see __init__.py) must not be imported by it.
+"""
+
+import subprocess
+import sys
+
+# milliseconds, the best of the runs must be below it
+IMPORT_TIME_BUDGET = 25
+
+# the modules that are only imported when they are used
+DEFERRED_MODULES = ("importlib.metadata", "dash", "asyncio", "concurrent.futures", "aio")
+
+
+def _package_import_times():
+    """Returns the cumulative import time of the package in microseconds, and the modules imported by it"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import plotly.io; import dash_bootstrap_templates"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # The modules imported by a module are listed before it, so the modules imported by the package are the ones
+    # between the plotly.io line and the dash_bootstrap_templates line.
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if name == "plotly.io":
+            modules = []
+        elif name == "dash_bootstrap_templates":
+            return int(cumulative), modules
+        else:
+            modules.append(name)
+    raise ValueError("dash_bootstrap_templates was not imported")
+
+
+def check(budget=IMPORT_TIME_BUDGET, runs=5):
+    """Raises ValueError if importing the package takes more than `budget` milliseconds or imports a deferred module"""
+    times = []
+    for _ in range(runs):
+        microseconds, modules = _package_import_times()
+        deferred = [name for name in modules if any(name == m or name.startswith(f"{m}.") for m in DEFERRED_MODULES)]
+        if deferred:
+            raise ValueError(f"import dash_bootstrap_templates imports {', '.join(deferred)}")
+        times.append(microseconds / 1000)
+    print(f"import dash_bootstrap_templates: {min(times):.1f} ms (budget {budget} ms)")
+    if min(times) > budget:
+        raise ValueError(f"import dash_bootstrap_templates takes {min(times):.1f} ms, more than {budget} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    check(float(args[args.index("--budget") + 1]) if "--budget" in args else IMPORT_TIME_BUDGET)
@@ -0,0 +1,101 @@
+"""
+Patches that change a figure's template to another template by only sending the parts that are different.
+"""
+
+import json
+from functools import lru_cache
+
+import plotly.io as pio
+
+# the value of the operations that delete a key
+_DELETE = object()
+
+# the approximate size of the json of a patch operation, without its location and value
+_OPERATION_SIZE = len('{"operation": "Assign", "location": [], "params": {"value": }}, ')
+
+
+def _operation_size(location, value=None):
+    return _OPERATION_SIZE + len(json.dumps(location)) + len(json.dumps(value, default=str))
+
+
+def _diff_operations(location, old, new):
+    """
+    Returns the (location, value) operations that change old to new, where a value of _DELETE deletes the key.
+    A changed dict or list of dicts is either replaced or patched, whichever sends less json.
+    """
+    operations = []
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations.extend((location + [key], _DELETE) for key in old.keys() - new.keys())
+        for key, value in new.items():
+            if key not in old:
+                operations.append((location + [key], value))
+            elif old[key] != value:
+                operations.extend(_diff_operations(location + [key], old[key], value))
+    elif _same_length_dict_lists(old, new):
+        # eg the list of default trace properties of each trace type in template.data
+        for i, (old_item, item) in enumerate(zip(old, new)):
+            if old_item != item:
+                operations.extend(_diff_operations(location + [i], old_item, item))
+    else:
+        return [(location, new)]
+
+    patch_size = sum(_operation_size(location, value) for location, value in operations)
+    if location and _operation_size(location, new) < patch_size:
+        return [(location, new)]
+    return operations
+
+
+def _same_length_dict_lists(old, new):
+    return (
+        isinstance(old, list)
+        and isinstance(new, list)
+        and len(old) == len(new)
+        and all(isinstance(item, dict) for item in old + new)
+    )
+
+
+@lru_cache(maxsize=None)
+def template_patch(from_theme, to_theme):
+    """Returns a dash.Patch that changes the template of a figure from one registered template to another
+
+    Only the parts of the template that are different are sent to the browser.  Switching between the light
+    and dark templates of a theme sends about 4-5 KB of json per figure instead of the 7-8 KB of the whole
+    template, and the patch is never larger than a patch that assigns the whole template:
+
+        @callback(Output("graph", "figure"), Input("switch", "value"))
+        def update_figure_template(switch_on):
+            return template_patch("minty_dark", "minty") if switch_on else template_patch("minty", "minty_dark")
+
+    The figure's template must be `from_theme`.  The patch is computed once for each pair of themes and
+    the same Patch is returned on each call, so it must not be changed.
+    """
+    from dash import Patch
+
+    patch = Patch()
+    operations = _diff_operations(
+        ["layout", "template"],
+        pio.templates[from_theme].to_plotly_json(),
+        pio.templates[to_theme].to_plotly_json(),
+    )
+    for location, value in operations:
+        target = patch
+        for key in location[:-1]:
+            target = target[key]
+        if value is _DELETE:
+            del target[location[-1]]
+        else:
+            target[location[-1]] = value
+
+    # the sizes of the operations are estimates, so compare the json that is actually sent
+    assign_patch = Patch()
+    assign_patch["layout"]["template"] = pio.templates[to_theme]
+    if _json_size(assign_patch) <= _json_size(patch):
+        return assign_patch
+    return patch
+
+
+def _json_size(patch):
+    """The size of the json of the patch in the callback response"""
+    from plotly.io.json import to_json_plotly
+
+    return len(to_json_plotly(patch.to_plotly_json()))
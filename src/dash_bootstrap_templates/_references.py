@@ -0,0 +1,123 @@
+"""
+Figures that carry a reference to their template instead of the template itself.
+
+The browser fetches each template once from the route added by serve_templates(), and a hook
+on Plotly.react replaces the reference with the template before the figure is drawn.
+"""
+
+import json
+from functools import lru_cache
+
+import plotly.graph_objects as go
+
+from dash_bootstrap_templates import _read_template_dict, _template_names
+from dash_bootstrap_templates._routes import serve_templates, template_url
+
+# the key in the template's layout.meta with the name of the referenced template
+TEMPLATE_REFERENCE_KEY = "dbt_template"
+
+# Runs in the <head> of the index page, before plotly.js is loaded.  When window.Plotly is set, it wraps
+# Plotly.react so that a figure whose template is a reference is drawn with the referenced template.
+TEMPLATE_REFERENCE_SCRIPT = """
+(function (templateUrls, key) {
+    const templates = {}
+    const loadTemplate = name => {
+        if (!templates[name]) {
+            templates[name] = fetch(templateUrls[name]).then(response => response.json())
+        }
+        return templates[name]
+    }
+    const resolveTemplate = layout => {
+        const template = layout && layout.template
+        const name = template && template.layout && template.layout.meta && template.layout.meta[key]
+        if (!name || !templateUrls[name]) {
+            return Promise.resolve(layout)
+        }
+        return loadTemplate(name).then(
+            template => ({...layout, template: template}),
+            () => layout
+        )
+    }
+    const wrap = Plotly => {
+        if (!Plotly || !Plotly.react || Plotly.react.templateReferences) {
+            return
+        }
+        const react = Plotly.react
+        Plotly.react = function (gd, data, layout, config) {
+            if (data && !Array.isArray(data)) {
+                // Plotly.react(gd, {data, layout, config, frames}), as used by dcc.Graph
+                return resolveTemplate(data.layout).then(layout => react(gd, {...data, layout: layout}))
+            }
+            return resolveTemplate(layout).then(layout => react(gd, data, layout, config))
+        }
+        Plotly.react.templateReferences = true
+    }
+    if (window.Plotly) {
+        wrap(window.Plotly)
+    } else {
+        let plotly
+        Object.defineProperty(window, "Plotly", {
+            configurable: true,
+            enumerable: true,
+            get: () => plotly,
+            set: value => {
+                plotly = value
+                wrap(value)
+            },
+        })
+    }
+})(%s, %s)
+"""
+
+
+@lru_cache(maxsize=None)
+def template_reference(name):
+    """Returns a template that refers to the template `name` instead of containing it
+
+    Use it in place of the template in figures sent to an app that uses use_template_references():
+
+        fig = px.scatter(df, x="gdpPercap", y="lifeExp", template=template_reference("minty"))
+        patched_figure["layout"]["template"] = template_reference("minty_dark")
+
+    or as the default template with `use_template(template_reference("minty"))`.
+
+    The browser replaces the reference with the template before the figure is drawn, so the figure
+    sent from the server only has the name of the template and its colorway and colorscales (which
+    plotly express uses to choose the colors of the traces).
+    """
+    if name not in _template_names():
+        raise ValueError(f"No figure template named {name!r}")
+    layout = _read_template_dict(name).get("layout", {})
+    reference = {key: layout[key] for key in ("colorway", "colorscale") if key in layout}
+    reference["meta"] = {TEMPLATE_REFERENCE_KEY: name}
+    return go.layout.Template(layout=reference)
+
+
+def use_template_references(app=None):
+    """Draw the figures that use template_reference() with the referenced templates
+
+    Keyword arguments:
+    app -- the Dash app. (Default: the app returned by dash.get_app())
+
+    This serves the templates from the app's server (see serve_templates) and adds a script to the
+    index page that fetches each template once, when a figure that refers to it is first drawn.
+    """
+    if app is None:
+        from dash import get_app
+
+        app = get_app()
+    serve_templates(app)
+    if getattr(app, "_dbt_template_references", False):
+        return
+    app._dbt_template_references = True
+
+    interpolate_index = app.interpolate_index
+
+    def interpolate_index_with_template_references(**kwargs):
+        # the urls are made when the page is served, to include the templates made by template_from_css
+        template_urls = {name: template_url(name, app) for name in _template_names()}
+        script = f"<script>{TEMPLATE_REFERENCE_SCRIPT % (json.dumps(template_urls), json.dumps(TEMPLATE_REFERENCE_KEY))}</script>"
+        kwargs["css"] = f"{kwargs['css']}\n{script}"
+        return interpolate_index(**kwargs)
+
+    app.interpolate_index = interpolate_index_with_template_references
@@ -0,0 +1,86 @@
+"""
+Serves the figure templates as json from the Dash server, so that the browser fetches and caches each template
+once instead of receiving it in every figure.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+from functools import lru_cache
+
+from dash_bootstrap_templates import _read_template_dict, _template_names
+
+TEMPLATES_PATH = "_dbt/templates/"
+
+
+@lru_cache(maxsize=None)
+def _template_response_data(name):
+    """Returns the json of the template, the gzipped json and its hash"""
+    body = json.dumps(_read_template_dict(name), separators=(",", ":")).encode("utf-8")
+    buffer = io.BytesIO()
+    # mtime=0 so that the gzipped json is the same on every server
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9, mtime=0) as f:
+        f.write(body)
+    return body, buffer.getvalue(), hashlib.sha256(body).hexdigest()[:20]
+
+
+def template_url(name, app=None):
+    """Returns the url of the template served by serve_templates(), with the hash of the template in the query string"""
+    if app is None:
+        from dash import get_app
+
+        app = get_app()
+    _, _, etag = _template_response_data(name)
+    return f"{app.config.requests_pathname_prefix}{TEMPLATES_PATH}{name}.json?v={etag}"
+
+
+def serve_templates(app=None):
+    """Add a route to the Dash app's server that serves the figure templates as json
+
+    Keyword arguments:
+    app -- the Dash app. (Default: the app returned by dash.get_app())
+
+    The templates are served at `/_dbt/templates/<name>.json`, gzipped if the browser accepts it,
+    with an ETag.  Use template_url(name) to get the url with the template's hash in the query
+    string, which can be cached by the browser for a year.  Without the hash, the browser has to
+    check with the server that the template didn't change (which returns 304 Not Modified when it didn't).
+
+    The ThemeSwitchAIO and ThemeChangerAIO components with `graph_class_name` fetch the templates
+    from this route instead of sending them all in the layout.
+    """
+    from flask import Response, abort, request
+
+    if app is None:
+        from dash import get_app
+
+        app = get_app()
+    if getattr(app, "_dbt_serve_templates", False):
+        return
+
+    def template_view(name):
+        if name not in _template_names():
+            abort(404)
+        body, gzipped_body, etag = _template_response_data(name)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        elif "gzip" in request.headers.get("Accept-Encoding", ""):
+            response = Response(gzipped_body, mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.vary.add("Accept-Encoding")
+        if request.args.get("v") == etag:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    app.server.add_url_rule(
+        f"{app.config.routes_pathname_prefix}{TEMPLATES_PATH}<name>.json",
+        # one endpoint for each Dash app of the Flask server
+        endpoint=f"dash_bootstrap_templates_template{app.config.routes_pathname_prefix}",
+        view_func=template_view,
+    )
+    app._dbt_serve_templates = True
@@ -0,0 +1,51 @@
+"""
+Checks that restoring the templates with load_template_snapshot() is faster than reading and validating them with
+load_figure_template("all"), each timed in a fresh interpreter:
+
+    $ python -m dash_bootstrap_templates._snapshot_time [--speedup FACTOR]
+
+The snapshot is saved in a temporary folder first.
+"""
+
+import subprocess
+import sys
+import tempfile
+
+# load_figure_template("all") must take at least this many times longer than load_template_snapshot()
+SNAPSHOT_SPEEDUP = 2
+
+_TIMED = (
+    "import sys, time; import dash_bootstrap_templates as dbt; cache_dir = sys.argv[1]; "
+    "start = time.perf_counter(); result = {call}; print((time.perf_counter() - start) * 1000); "
+    "sys.exit(result is False)"
+)
+
+
+def _time(call, cache_dir):
+    """Returns the milliseconds that `call` takes after the package is imported in a new interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMED.format(call=call), cache_dir], capture_output=True, text=True
+    )
+    if result.returncode:
+        raise ValueError(f"{call} failed: {result.stderr or 'the snapshot was not found'}")
+    return float(result.stdout)
+
+
+def check(speedup=SNAPSHOT_SPEEDUP, runs=5):
+    """Raises ValueError if load_template_snapshot() isn't `speedup` times faster than load_figure_template("all")"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _time('dbt.load_figure_template("all"), dbt.save_template_snapshot(cache_dir)', cache_dir)
+        load_times = [_time('dbt.load_figure_template("all")', cache_dir) for _ in range(runs)]
+        restore_times = [_time("dbt.load_template_snapshot(cache_dir)", cache_dir) for _ in range(runs)]
+    print(f'load_figure_template("all"): {min(load_times):.1f} ms')
+    print(f"load_template_snapshot(): {min(restore_times):.1f} ms")
+    if min(restore_times) * speedup > min(load_times):
+        raise ValueError(
+            f"load_template_snapshot() takes {min(restore_times):.1f} ms, which is not {speedup} times faster "
+            f'than the {min(load_times):.1f} ms of load_figure_template("all")'
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    check(float(args[args.index("--speedup") + 1]) if "--speedup" in args else SNAPSHOT_SPEEDUP)
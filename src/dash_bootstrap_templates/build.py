@@ -0,0 +1,377 @@
+"""
+Generates the Plotly figure templates for the Bootstrap/Bootswatch themes that are available in the
+dash-bootstrap-components library, in light and dark color mode.
+
+This will be run periodically to refresh the templates if there are changes to Bootstrap themes:
+
+    $ python -m dash_bootstrap_templates.build
+
+Options:
+    --themes  The themes to generate (default: all).  A theme can also be given as name=url or name=path
+              to generate a template for another stylesheet, eg `--themes minty my_theme=assets/my_theme.css`
+    --out     The folder of the json templates (default: the package's templates folder)
+    --jobs    The number of processes (default: the number of CPUs)
+    --cache-dir  The folder of the cached stylesheets (default: ~/.cache/dash_bootstrap_templates)
+    --force   Build all the templates, even the ones whose stylesheet didn't change
+    --benchmark  Time the parsing of the stylesheets instead of building the templates (see _from_css.benchmark)
+    --check   Check the incremental build with the stylesheets served by a local http server, instead of
+              building the templates (see check).  The --themes given as name=path are checked, or a sample.
+
+The fetched stylesheets are cached, and are only downloaded again when the server says they changed
+(see _css_cache.py).  The `build.manifest` file in the output folder has the sha256 of the stylesheet
+and of the generator (the code that makes the templates, and the plotly and spectra versions) used to build
+each theme's templates, so only the templates of the themes that changed are built again.  Files are only
+written when their content changed.
+
+Generating the templates requires the packages in the `dev` extra: `pip install dash-bootstrap-templates[dev]`
+
+Note: The Vizro Plotly templates are manually created and are not generated by this script.
+They are directly sourced from: https://github.com/mckinsey/vizro/tree/main/vizro-core/src/vizro/_themes
+"""
+
+import argparse
+import json
+import os
+import pathlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import dash_bootstrap_components as dbc
+import plotly.io as pio
+from plotly.utils import PlotlyJSONEncoder
+
+from dash_bootstrap_templates import BUNDLE_NAME
+from dash_bootstrap_templates._bundle import TEMPLATES_PATH, template_overlay, write_bundle
+from dash_bootstrap_templates._css_cache import CSSCache, sha256
+
+MANIFEST_NAME = "build.manifest"
+
+# The code that makes the content of the templates is part of the manifest's generator hash: the modules that
+# make the templates from the stylesheets, and the functions that convert them and save them as overlays
+GENERATOR_MODULES = ("_colors.py", "_from_css.py")
+GENERATOR_FUNCTIONS = (
+    ("dash_bootstrap_templates", "_merge_template"),
+    ("dash_bootstrap_templates._bundle", "_overlay"),
+    ("dash_bootstrap_templates._bundle", "template_overlay"),
+    ("dash_bootstrap_templates.build", "to_json_dict"),
+    ("dash_bootstrap_templates.build", "build_theme_templates"),
+)
+# the packages whose version changes the templates
+GENERATOR_PACKAGES = ("plotly", "spectra")
+
+# The following Bootstrap themes will be generated:
+dbc_themes_url = {
+    "BOOTSTRAP": dbc.themes.BOOTSTRAP,
+    "CERULEAN": dbc.themes.CERULEAN,
+    "COSMO": dbc.themes.COSMO,
+    "FLATLY": dbc.themes.FLATLY,
+    "JOURNAL": dbc.themes.JOURNAL,
+    "LITERA": dbc.themes.LITERA,
+    "LUMEN": dbc.themes.LUMEN,
+    "LUX": dbc.themes.LUX,
+    "MATERIA": dbc.themes.MATERIA,
+    "MINTY": dbc.themes.MINTY,
+    "PULSE": dbc.themes.PULSE,
+    "SANDSTONE": dbc.themes.SANDSTONE,
+    "SIMPLEX": dbc.themes.SIMPLEX,
+    "SKETCHY": dbc.themes.SKETCHY,
+    "SPACELAB": dbc.themes.SPACELAB,
+    "UNITED": dbc.themes.UNITED,
+    "YETI": dbc.themes.YETI,
+    "CYBORG": dbc.themes.CYBORG,
+    "DARKLY": dbc.themes.DARKLY,
+    "SLATE": dbc.themes.SLATE,
+    "SOLAR": dbc.themes.SOLAR,
+    "SUPERHERO": dbc.themes.SUPERHERO,
+    "QUARTZ": dbc.themes.QUARTZ,
+    "MORPH": dbc.themes.MORPH,
+    "VAPOR": dbc.themes.VAPOR,
+    "ZEPHYR": dbc.themes.ZEPHYR,
+}
+
+# The templates are saved as the changes made to the plotly base template they were built from
+# (see get_template), and the base templates are saved in the templates/base folder
+BASE_TEMPLATE_NAMES = ("plotly_white", "plotly_dark")
+
+
+def to_json_dict(template):
+    return json.loads(json.dumps(template, cls=PlotlyJSONEncoder))
+
+
+def generator_hash():
+    """
+    The sha256 of the code that makes the content of the templates, and of the versions of plotly (which has the
+    base templates) and spectra.  Changes to the command line, the checks and the benchmarks don't change it.
+    """
+    import importlib
+    import inspect
+    from importlib.metadata import PackageNotFoundError, version
+
+    package_path = pathlib.Path(__file__).parent
+    parts = []
+    for package in GENERATOR_PACKAGES:
+        try:
+            parts.append(f"{package}=={version(package)}".encode("utf-8"))
+        except PackageNotFoundError:
+            parts.append(package.encode("utf-8"))
+    for module in GENERATOR_MODULES:
+        parts.append(package_path.joinpath(module).read_bytes())
+    for module, function in GENERATOR_FUNCTIONS:
+        parts.append(inspect.getsource(getattr(importlib.import_module(module), function)).encode("utf-8"))
+    return sha256(b"\0".join(parts))
+
+
+def build_theme_templates(css_text):
+    """
+    Returns the light and dark templates of the stylesheet as json dicts: {template name suffix: template}.
+    The stylesheet is parsed once for both color modes.  Runs in the worker processes.
+    """
+    from dash_bootstrap_templates._from_css import build_plotly_templates_from_bootstrap_css_text
+
+    templates = build_plotly_templates_from_bootstrap_css_text(css_text)
+    return {"": to_json_dict(templates["light"]), "_dark": to_json_dict(templates["dark"])}
+
+
+def write_if_changed(path, text):
+    """Writes the text to the file, unless the file already has that text. Returns True if it was written."""
+    data = text.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+def read_manifest(out):
+    try:
+        with open(out.joinpath(MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def parse_themes(themes):
+    """Returns a dict of {template name: stylesheet url or path} for the --themes option"""
+    if not themes:
+        return {theme.lower(): url for theme, url in dbc_themes_url.items()}
+    themes_url = {}
+    for theme in themes:
+        name, separator, url = theme.partition("=")
+        if not separator:
+            if name.upper() not in dbc_themes_url:
+                raise ValueError(f"Unknown theme {name!r}. Use name=url for other stylesheets.")
+            url = dbc_themes_url[name.upper()]
+        themes_url[name.lower()] = url
+    return themes_url
+
+
+def fetch_stylesheets(themes_url, cache_dir=None):
+    """Returns {name: css text} for the {name: url} of the themes"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    # fetch the stylesheets in threads, since it's waiting on the network
+    cache = CSSCache(cache_dir)
+    with ThreadPoolExecutor(max_workers=min(8, len(themes_url))) as executor:
+        return dict(zip(themes_url, executor.map(cache.fetch, themes_url.values())))
+
+
+def build(themes=None, out=TEMPLATES_PATH, jobs=None, cache_dir=None, force=False):
+    """
+    Generates the templates of the themes that changed since the last build and saves them as json files
+    in `out`, then updates the bundle.  Returns the names of the templates that were written.
+    """
+    themes_url = parse_themes(themes)
+    out = pathlib.Path(out)
+    out.joinpath("base").mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    written = []
+
+    base_templates = {name: to_json_dict(pio.templates[name]) for name in BASE_TEMPLATE_NAMES}
+    for name, base_template in base_templates.items():
+        if write_if_changed(out.joinpath("base", f"{name}.json"), json.dumps(base_template)):
+            written.append(f"base/{name}")
+
+    css_texts = fetch_stylesheets(themes_url, cache_dir)
+    manifest = read_manifest(out)
+    generator = generator_hash()
+    entries = {
+        name: {"url": url, "css": sha256(css_texts[name]), "generator": generator} for name, url in themes_url.items()
+    }
+    changed = [
+        name
+        for name, entry in entries.items()
+        if force
+        or manifest.get(name) != entry
+        or not all(out.joinpath(f"{name}{suffix}.json").exists() for suffix in ("", "_dark"))
+    ]
+    for name in themes_url:
+        if name not in changed:
+            print(f"{name}: unchanged")
+
+    def save_templates(results):
+        for name, templates in zip(changed, results):
+            for suffix, template in templates.items():
+                if write_if_changed(
+                    out.joinpath(f"{name}{suffix}.json"), json.dumps(template_overlay(template, base_templates))
+                ):
+                    written.append(f"{name}{suffix}")
+            print(f"{name}: light and dark templates built")
+
+    css_changed = [css_texts[name] for name in changed]
+    if jobs == 1 or len(changed) <= 1:
+        save_templates(map(build_theme_templates, css_changed))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(changed))) as executor:
+            save_templates(executor.map(build_theme_templates, css_changed))
+
+    manifest.update(entries)
+    write_if_changed(out.joinpath(MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True))
+
+    # pack all the json templates in a single file that the package loads with one read
+    if written or not out.joinpath(BUNDLE_NAME).exists():
+        write_bundle(out)
+    print(f"{len(written)} figure templates saved in {out}")
+    return written
+
+
+class _StylesheetHandler(BaseHTTPRequestHandler):
+    """Serves the stylesheets of the server's `stylesheets` dict {path: css text} with an ETag, for check()"""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        css_text = self.server.stylesheets.get(self.path)
+        if css_text is None:
+            self.send_error(404)
+            return
+        etag = f'"{sha256(css_text)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = css_text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/css")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _check_templates(out, name, css_text):
+    """Raises ValueError if the background of the light template isn't the --bs-body-bg of the tinycss2 parse"""
+    from dash_bootstrap_templates import _merge_template
+    from dash_bootstrap_templates._from_css import parse_all_rules_from_bootstrap_css
+
+    overlay = json.loads(out.joinpath(f"{name}.json").read_text())
+    base = json.loads(out.joinpath("base", f"{overlay.pop('_base')}.json").read_text())
+    plot_bgcolor = _merge_template(base, overlay)["layout"]["plot_bgcolor"]
+    expected = parse_all_rules_from_bootstrap_css(css_text).get(":root", {}).get("--bs-body-bg", "#fff")
+    if plot_bgcolor != expected:
+        raise ValueError(f"The plot_bgcolor of {name} is {plot_bgcolor}, not the --bs-body-bg {expected}")
+
+
+def check(stylesheets=None):
+    """
+    Builds the templates of the stylesheets {name: css text} served by a local http server, in a temporary folder,
+    and raises ValueError if the build doesn't only download and build what changed:
+
+    - the first build downloads the stylesheets and writes the templates, which have the --bs-body-bg of the
+      tinycss2 parse of the stylesheet as their background
+    - the second build sends the ETag of the cached stylesheets, gets 304 responses and writes nothing
+    - after a stylesheet changed, only the templates of that stylesheet are written
+    - when the server is down, the cached stylesheets are used and nothing is written
+    """
+    import tempfile
+    import threading
+    import warnings
+
+    from dash_bootstrap_templates._from_css import _CHECK_STYLESHEET
+
+    stylesheets = stylesheets or {"sample": _CHECK_STYLESHEET}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StylesheetHandler)
+    server.stylesheets = {f"/{name}.css": css_text for name, css_text in stylesheets.items()}
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    themes = [f"{name}={url}/{name}.css" for name in stylesheets]
+
+    def expect(description, actual, expected):
+        if actual != expected:
+            raise ValueError(f"{description}: {actual}, expected {expected}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = pathlib.Path(tmp, "templates")
+        cache_dir = pathlib.Path(tmp, "cache")
+        try:
+            written = build(themes, out, jobs=1, cache_dir=cache_dir)
+            expected = [f"{name}{suffix}" for name in stylesheets for suffix in ("", "_dark")]
+            expect("templates written by the first build", sorted(n for n in written if "/" not in n), sorted(expected))
+            etags = [etag for _, etag in server.requests]
+            expect("conditional requests of the first build", etags, [None] * len(themes))
+            for name, css_text in stylesheets.items():
+                _check_templates(out, name, css_text)
+
+            server.requests.clear()
+            manifest = out.joinpath(MANIFEST_NAME).read_bytes()
+            expect("templates written by the second build", build(themes, out, jobs=1, cache_dir=cache_dir), [])
+            expect("requests of the second build without an ETag", [p for p, etag in server.requests if not etag], [])
+            expect("manifest changed by the second build", out.joinpath(MANIFEST_NAME).read_bytes() == manifest, True)
+
+            changed = next(iter(stylesheets))
+            server.stylesheets[f"/{changed}.css"] += "\n:root{--bs-danger:#123456}"
+            written = build(themes, out, jobs=1, cache_dir=cache_dir)
+            expect("templates written after a stylesheet changed", sorted(written), [changed, f"{changed}_dark"])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            expect("templates written when the server is down", build(themes, out, jobs=1, cache_dir=cache_dir), [])
+    print(f"incremental build checked with {len(stylesheets)} stylesheets")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m dash_bootstrap_templates.build",
+        description="Generate the Plotly figure templates of the Bootstrap themes",
+    )
+    parser.add_argument(
+        "--themes",
+        nargs="+",
+        metavar="THEME",
+        help="the themes to generate (default: all), or name=url to generate a template for another stylesheet",
+    )
+    parser.add_argument("--out", default=TEMPLATES_PATH, type=pathlib.Path, help="the folder of the json templates")
+    parser.add_argument("--jobs", type=int, help="the number of processes (default: the number of CPUs)")
+    parser.add_argument("--cache-dir", type=pathlib.Path, help="the folder of the cached stylesheets")
+    parser.add_argument("--force", action="store_true", help="build all the templates, even the unchanged ones")
+    parser.add_argument(
+        "--benchmark", action="store_true", help="time the parsing of the stylesheets instead of building the templates"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="check the incremental build with a local http server (see check)"
+    )
+    options = parser.parse_args(args)
+    try:
+        if options.check:
+            check(fetch_stylesheets(parse_themes(options.themes)) if options.themes else None)
+            return
+        if options.benchmark:
+            from dash_bootstrap_templates._from_css import benchmark
+
+            benchmark(fetch_stylesheets(parse_themes(options.themes), options.cache_dir))
+            return
+        build(options.themes, options.out, options.jobs, options.cache_dir, options.force)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()